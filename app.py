@@ -1,13 +1,33 @@
 from __future__ import annotations
 
+import os
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 import pandas as pd
 import numpy as np
 from shiny import App, ui, render, reactive, req
-import refinitiv.data as rd
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Mount, Route
 import plotly.graph_objects as go
-from scipy import interpolate
+from shinywidgets import output_widget, render_plotly
+
+from deviltongues.analysis_cache import AnalysisCache
+from deviltongues.chain import build_surface_df, fetch_option_chain, fetch_spot
+from deviltongues.chain_cache import ChainCache
+from deviltongues.chain_search import ChainQuery
+from deviltongues.execution import calculate_execution_costs, execution_costs_batch, get_strategy_summary
+from deviltongues.history import HistoryStore
+from deviltongues.metrics import metrics
+from deviltongues.paging import PagedTable, TableView
+from deviltongues.refresh import RefreshDaemon, SnapshotStore
+from deviltongues.scanner import scan_underlyings
+from deviltongues.schema import memory_report
+from deviltongues.providers import get_provider
+from deviltongues.resilience import request_executor
+from deviltongues.session import session_manager
+from deviltongues.surface import SurfaceEngine
 
 
 # ---------- helpers ----------
@@ -23,46 +43,33 @@ today = datetime.today().date()
 default_min_expiry = get_next_friday(today)
 default_max_expiry = today + timedelta(days=120)
 
+CHAIN_SORT_COLUMNS = {
+    "StrikePrice": "Strike",
+    "ExpiryDate": "Expiry",
+    "CallPutOption": "Type",
+    "Bid": "Bid",
+    "Ask": "Ask",
+    "Last": "Last",
+    "RIC": "RIC",
+}
 
-def build_surface_df(df: pd.DataFrame, spot: float) -> pd.DataFrame:
-    df = df.copy()
-    df["Bid"] = pd.to_numeric(df.get("Bid"), errors="coerce")
-    df["Ask"] = pd.to_numeric(df.get("Ask"), errors="coerce")
-    df["Last"] = pd.to_numeric(df.get("Last"), errors="coerce")
+UNDERLYING_CHOICES = [
+    "AAPL.O", "MSFT.O", "TSLA.O", "NVDA.O",
+    "AMZN.O", "META.O", "GOOGL.O", "NFLX.O",
+    "AMD.O", "INTC.O", "JPM.N", "GS.N",
+]
 
-    df["mid"] = df[["Bid", "Ask"]].mean(axis=1)
-    df.loc[df["mid"].isna(), "mid"] = df["Last"]
+# shared by every session, keyed on the content of surface_data
+analysis_cache = AnalysisCache(maxsize=32)
+# chain structure changes at most daily, so scans only need fresh prices
+chain_cache = ChainCache(ttl=timedelta(hours=12))
+# triangulation and weights per strike/expiry layout, so refreshes only re-weight the rates
+surface_engine = SurfaceEngine()
 
-    df["ExpiryDate"] = pd.to_datetime(df["ExpiryDate"])
-    now = pd.Timestamp.now()
-    df["T"] = (df["ExpiryDate"] - now).dt.days / 365.0
-    df["K"] = df["StrikePrice"]
-    df["S"] = spot
 
-    return df[["RIC", "K", "T", "mid", "S", "StrikePrice", "ExpiryDate", "CallPutOption"]]
-
-
-def compute_implied_r(row):
-    try:
-        if row["T"] <= 0 or row["K"] <= 0:
-            return np.nan
-
-        numerator = row["S"] - (row["C_mid"] - row["P_mid"])
-        if numerator <= 0:
-            return np.nan
-
-        r = -(1 / row["T"]) * np.log(numerator / row["K"])
-        return r
-    except:
-        return np.nan
-
-
-def get_strategy_summary(signal: str) -> str:
-    if "Sell synthetic" in signal:
-        return "Sell Call+Buy Put+Buy Stock"
-    elif "Buy synthetic" in signal:
-        return "Buy Call+Sell Put+Short Stock"
-    return signal
+def numeric_input(value, default: float, low: float, high: float) -> float:
+    """A numeric box's value clamped to [low, high], or `default` when the box is cleared."""
+    return default if value is None else min(max(value, low), high)
 
 
 def get_strategy_details(row) -> dict:
@@ -102,124 +109,20 @@ def get_strategy_details(row) -> dict:
 
 
 def analyze_arbitrage(surface_df: pd.DataFrame, risk_free_rate: float = 0.05, threshold: float = 0.005):
-    calls = surface_df[surface_df["CallPutOption"] == "Call"].copy()
-    puts = surface_df[surface_df["CallPutOption"] == "Put"].copy()
-
-    merged = calls.merge(
-        puts,
-        on=["K", "T", "S", "ExpiryDate"],
-        suffixes=("_call", "_put")
-    )
-
-    merged["C_mid"] = merged["mid_call"]
-    merged["P_mid"] = merged["mid_put"]
-    merged["implied_r"] = merged.apply(compute_implied_r, axis=1)
-    merged["r_diff"] = merged["implied_r"] - risk_free_rate
-
-    merged["signal"] = None
-    merged.loc[merged["r_diff"] > threshold, "signal"] = "Sell synthetic, buy stock"
-    merged.loc[merged["r_diff"] < -threshold, "signal"] = "Buy synthetic, short stock"
-
-    return merged[merged["signal"].notna()]
-
-
-def calculate_execution_costs(row, contracts, commission, slippage_pct, risk_free_rate):
-    multiplier = 100
-
-    strike = row['K']
-    spot = row['S']
-    call_mid = row['C_mid']
-    put_mid = row['P_mid']
-    days_to_expiry = row['T'] * 365
-    T = row['T']
-    implied_rate = row['implied_r']
-    rate_diff = row['r_diff']
-
-    strategy_type = get_strategy_summary(row['signal'])
-
-    call_value = call_mid * contracts * multiplier
-    put_value = put_mid * contracts * multiplier
-    stock_value = spot * contracts * multiplier
-    strike_value = strike * contracts * multiplier
-
-    total_commission = commission * 3
-    total_notional = call_value + put_value + stock_value
-    slippage_cost = total_notional * (slippage_pct / 100)
-    total_costs = total_commission + slippage_cost
-
-    if strategy_type == "Sell Call+Buy Put+Buy Stock":
-        call_credit = call_value
-        put_debit = put_value
-        stock_debit = stock_value
-
-        option_net = call_credit - put_debit
-        initial_outflow = stock_debit - option_net + total_costs
+    return analysis_cache.analyze(surface_df, risk_free_rate, threshold)
 
-        expiry_inflow = strike_value
-        expected_outflow_with_interest = initial_outflow * np.exp(risk_free_rate * T)
-        net_pnl = expiry_inflow - expected_outflow_with_interest
 
-        theoretical_profit = rate_diff * strike_value * T
-        required_margin = stock_value * 0.5
-        capital_employed = initial_outflow
-
-        initial_cash = -initial_outflow
-        expiry_cash = expiry_inflow
-
-    else:
-        call_debit = call_value
-        put_credit = put_value
-        stock_credit = stock_value
-
-        option_net = put_credit - call_debit
-        initial_inflow = stock_credit + option_net - total_costs
-
-        expiry_outflow = strike_value
-        expected_inflow_with_interest = initial_inflow * np.exp(risk_free_rate * T)
-        net_pnl = expected_inflow_with_interest - expiry_outflow
-
-        theoretical_profit = abs(rate_diff) * strike_value * T
-        required_margin = stock_value * 1.5
-        capital_employed = required_margin
-
-        initial_cash = initial_inflow
-        expiry_cash = -expiry_outflow
-
-    roi = (theoretical_profit / capital_employed * 100) if capital_employed > 0 else 0
-    annualized_return = (roi * 365 / days_to_expiry) if days_to_expiry > 0 else 0
-
-    best_case = theoretical_profit * 1.3
-    worst_case = theoretical_profit * 0.7
-
-    return {
-        'strategy_type': strategy_type,
-        'strike': strike,
-        'spot': spot,
-        'call_mid': call_mid,
-        'put_mid': put_mid,
-        'call_value': call_value,
-        'put_value': put_value,
-        'stock_value': stock_value,
-        'strike_value': strike_value,
-        'option_net': option_net,
-        'initial_cash': initial_cash,
-        'expiry_cash': expiry_cash,
-        'total_commission': total_commission,
-        'slippage_cost': slippage_cost,
-        'total_costs': total_costs,
-        'net_pnl': net_pnl,
-        'theoretical_profit': theoretical_profit,
-        'required_margin': required_margin,
-        'capital_employed': capital_employed,
-        'roi': roi,
-        'annualized_return': annualized_return,
-        'best_case': best_case,
-        'worst_case': worst_case,
-        'days_to_expiry': days_to_expiry,
-        'implied_rate': implied_rate,
-        'rate_diff': rate_diff,
-        'risk_free_rate': risk_free_rate
-    }
+# one background refresh per watched chain, however many sessions display it
+snapshot_store = SnapshotStore()
+refresh_daemon = RefreshDaemon(
+    snapshot_store,
+    interval=float(os.environ.get("DEVILTONGUES_REFRESH_SECONDS", "60")),
+    cache=chain_cache,
+    analyze=analyze_arbitrage,
+)
+# every fetched chain, manual or refreshed, is appended to the on-disk history
+history_store = HistoryStore()
+snapshot_store.subscribe(history_store.append_snapshot)
 
 
 # ---------- UI ----------
@@ -353,11 +256,7 @@ app_ui = ui.page_navbar(
                     ui.input_selectize(
                         "underlying_ric",
                         "Underlying Asset RIC",
-                        choices=[
-                            "AAPL.O", "MSFT.O", "TSLA.O", "NVDA.O",
-                            "AMZN.O", "META.O", "GOOGL.O", "NFLX.O",
-                            "AMD.O", "INTC.O", "JPM.N", "GS.N",
-                        ],
+                        choices=UNDERLYING_CHOICES,
                         selected="MSFT.O",
                         options={"maxItems": 1},
                     ),
@@ -383,15 +282,32 @@ app_ui = ui.page_navbar(
                         ui.input_date("min_expiry", "Min Expiry", value=default_min_expiry),
                         ui.input_date("max_expiry", "Max Expiry", value=default_max_expiry),
                     ),
-                    ui.input_numeric("top_options", "Max Contracts", value=1000),
+                    ui.input_checkbox("rediscover_chain", "Re-discover chain (ignore cached contracts)", value=False),
                     ui.input_action_button(
                         "fetch_chain", "SCAN OPTIONS CHAIN", class_="btn-primary w-100"
                     ),
+                    ui.input_checkbox("live_refresh", "Live refresh (shared background snapshots)", value=False),
                 ),
             ),
             ui.div(
                 {"class": "data-section"},
                 ui.h3("Options Chain Data", {"class": "section-title"}),
+                ui.output_text("snapshot_status"),
+                ui.div(
+                    {"class": "input-row"},
+                    ui.input_text("chain_filter", "Filter RIC", placeholder="e.g. MSFTA17"),
+                    ui.input_select("chain_type", "Type", choices={"": "All", "Call": "Calls", "Put": "Puts"}),
+                    ui.input_select("chain_sort", "Sort by", choices={"": "Chain order", **CHAIN_SORT_COLUMNS}),
+                    ui.input_checkbox("chain_descending", "Descending", value=False),
+                    ui.input_select("chain_page_size", "Rows per page", choices=["25", "50", "100", "250"], selected="50"),
+                ),
+                ui.div(
+                    {"class": "input-row"},
+                    ui.input_action_button("chain_prev", "◀ PREV"),
+                    ui.input_numeric("chain_page", "Page", value=1, min=1),
+                    ui.input_action_button("chain_next", "NEXT ▶"),
+                    ui.output_text("chain_page_status"),
+                ),
                 ui.output_data_frame("options_table"),
             ),
         ),
@@ -422,6 +338,49 @@ app_ui = ui.page_navbar(
             ),
         ),
     ),
+    ui.nav_panel(
+        "Watchlist Scan",
+        ui.div(
+            {"class": "page-container"},
+            ui.h1("Multi-Underlying Scanner", {"class": "page-title"}),
+            ui.p("Scan several underlyings concurrently and rank every opportunity by after-cost P&L", {"class": "page-subtitle"}),
+            ui.div(
+                {"class": "control-grid"},
+                ui.div(
+                    {"class": "control-section"},
+                    ui.h3("Watchlist", {"class": "section-title"}),
+                    ui.input_selectize(
+                        "watchlist",
+                        "Underlying Asset RICs",
+                        choices=UNDERLYING_CHOICES,
+                        selected=["AAPL.O", "MSFT.O", "NVDA.O", "TSLA.O"],
+                        multiple=True,
+                    ),
+                    ui.input_numeric("watchlist_band", "Strike Band around Spot (%)", value=20, min=1, max=100),
+                ),
+                ui.div(
+                    {"class": "control-section"},
+                    ui.h3("Expiries & Limits", {"class": "section-title"}),
+                    ui.div(
+                        {"class": "input-row"},
+                        ui.input_date("watchlist_min_expiry", "Min Expiry", value=default_min_expiry),
+                        ui.input_date("watchlist_max_expiry", "Max Expiry", value=default_max_expiry),
+                    ),
+                    ui.input_numeric("watchlist_rate_limit", "LSEG Requests per Second", value=10, min=1, max=100),
+                    ui.input_action_button(
+                        "scan_watchlist", "SCAN WATCHLIST", class_="btn-primary w-100"
+                    ),
+                ),
+            ),
+            ui.div(
+                {"class": "data-section"},
+                ui.h3("Ranked Opportunities", {"class": "section-title"}),
+                ui.p("Uses the risk-free rate and threshold from the Analysis tab and the cost inputs from the Execution Calculator."),
+                ui.output_text("watchlist_summary"),
+                ui.output_data_frame("watchlist_table"),
+            ),
+        ),
+    ),
     ui.nav_panel(
         "Execution Calculator",
         ui.div(
@@ -438,13 +397,22 @@ app_ui = ui.page_navbar(
             {"class": "page-container"},
             ui.h1("Implied Rate Surface", {"class": "page-title"}),
             ui.p("Interactive 3D visualization of implied risk-free rates", {"class": "page-subtitle"}),
+            ui.output_ui("surface_status"),
+            output_widget("surface_plot", height="600px"),
+        ),
+    ),
+    ui.nav_panel(
+        "Diagnostics",
+        ui.div(
+            {"class": "page-container"},
+            ui.h1("Pipeline Latency", {"class": "page-title"}),
+            ui.p("Rolling p50/p95/p99 per stage and underlying, also served as Prometheus text at /metrics", {"class": "page-subtitle"}),
             ui.div(
-                {"class": "info-banner"},
-                ui.p(
-                    "ℹ️ Note: If the 3D surface doesn't appear after clicking 'ANALYZE ARBITRAGE', please click the button again to refresh the visualization.",
-                ),
+                {"class": "data-section"},
+                ui.output_text("diagnostics_summary"),
+                ui.output_text("session_memory"),
+                ui.output_data_frame("latency_table"),
             ),
-            ui.output_ui("surface_plot"),
         ),
     ),
     title="DevilTongues",
@@ -454,15 +422,19 @@ app_ui = ui.page_navbar(
 
 # ---------- server ----------
 def server(input, output, session):
-    rd.open_session()
-    session.on_ended(rd.close_session)
+    provider = get_provider()
+    provider.open()
+    session.on_ended(provider.close)
 
     spot_price_data = reactive.Value(None)
+    spot_error = reactive.Value(None)
     exchange_time_data = reactive.Value(None)
     option_data = reactive.Value(None)
     surface_data = reactive.Value(None)
     arbitrage_data = reactive.Value(None)
     selected_arb_row = reactive.Value(None)
+    watchlist_data = reactive.Value(None)
+    live_query = reactive.Value(None)
 
     calc_contracts = reactive.Value(10)
     calc_commission = reactive.Value(5.0)
@@ -502,15 +474,18 @@ def server(input, output, session):
         fetch_time = datetime.now()
 
         try:
-            df = rd.get_data(ric, fields=["TR.PriceClose"])
-            spot_price_data.set(df["Price Close"].iloc[0])
-            exchange_time_data.set(fetch_time.strftime("%Y-%m-%d %H:%M:%S"))
+            spot_price_data.set(fetch_spot(ric))
+            spot_error.set(None)
         except Exception as e:
-            exchange_time_data.set(fetch_time.strftime("%Y-%m-%d %H:%M:%S"))
+            spot_error.set(f"{type(e).__name__}: {e}")
             print(f"Error fetching spot price: {e}")
+        exchange_time_data.set(fetch_time.strftime("%Y-%m-%d %H:%M:%S"))
 
     @render.text
     def spot_price():
+        error = spot_error.get()
+        if error is not None:
+            return f"Spot price unavailable ({error})"
         req(spot_price_data.get() is not None)
         return f"Spot Price: ${spot_price_data.get():.2f}"
 
@@ -529,62 +504,210 @@ def server(input, output, session):
 
         fetch_time = datetime.now()
 
-        filter_str = (
-            "( SearchAllCategoryv2 eq 'Options' and "
-            f"(ExpiryDate gt {input.min_expiry()} and ExpiryDate lt {input.max_expiry()}) and "
-            f"(StrikePrice ge {input.min_strike()} and StrikePrice le {input.max_strike()}) and "
-            "ExchangeName xeq 'OPRA' and "
-            f"(UnderlyingQuoteRIC eq '{ric}'))"
-        )
-
-        chain = rd.discovery.search(
-            view=rd.discovery.Views.EQUITY_QUOTES,
-            top=input.top_options(),
-            filter=filter_str,
-            select="RIC,CallPutOption,StrikePrice,ExpiryDate",
+        query = ChainQuery(
+            underlying=ric,
+            min_strike=input.min_strike(),
+            max_strike=input.max_strike(),
+            min_expiry=input.min_expiry(),
+            max_expiry=input.max_expiry(),
         )
+        if input.rediscover_chain():
+            chain_cache.invalidate(query=query)
+        merged = fetch_option_chain(query, cache=chain_cache).chain
 
-        if chain.empty:
-            option_data.set(chain)
+        if merged.empty:
+            option_data.set(merged)
             surface_data.set(None)
             exchange_time_data.set(fetch_time.strftime("%Y-%m-%d %H:%M:%S"))
             return
 
-        chain["RIC"] = chain["RIC"].astype(str)
-
-        raw_price = rd.get_data(
-            universe=chain["RIC"].tolist(),
-            fields=["CF_BID", "CF_ASK", "CF_LAST"],
-        ).reset_index()
-
-        candidate_cols = ["RIC", "Instrument", "ric", "instrument", "index"]
-        ric_col = None
-        for c in candidate_cols:
-            if c in raw_price.columns:
-                ric_col = c
-                break
-        if ric_col is None:
-            ric_col = raw_price.columns[0]
-
-        price_df = raw_price.rename(
-            columns={
-                ric_col: "RIC",
-                "CF_BID": "Bid",
-                "CF_ASK": "Ask",
-                "CF_LAST": "Last",
-            }
-        )[["RIC", "Bid", "Ask", "Last"]]
-
-        price_df["RIC"] = price_df["RIC"].astype(str)
-
-        merged = chain.merge(price_df, on="RIC", how="left")
         option_data.set(merged)
+        try:
+            history_store.append(ric, merged, spot, fetch_time)
+        except Exception as e:
+            print(f"Error recording chain history: {e}")
 
-        surf = build_surface_df(merged, spot)
+        with metrics.time("build_surface_df", ric):
+            surf = build_surface_df(merged, spot)
         surface_data.set(surf)
 
         exchange_time_data.set(fetch_time.strftime("%Y-%m-%d %H:%M:%S"))
 
+    @reactive.effect
+    def _update_live_query():
+        query = None
+        if input.live_refresh():
+            query = ChainQuery(
+                underlying=input.underlying_ric(),
+                min_strike=input.min_strike(),
+                max_strike=input.max_strike(),
+                min_expiry=input.min_expiry(),
+                max_expiry=input.max_expiry(),
+            )
+
+        with reactive.isolate():
+            previous = live_query.get()
+        if query == previous:
+            return
+        if previous is not None:
+            refresh_daemon.unwatch(previous)
+        if query is not None:
+            refresh_daemon.watch(query)
+        live_query.set(query)
+
+    def _end_live_refresh():
+        with reactive.isolate():
+            query = live_query.get()
+        if query is not None:
+            refresh_daemon.unwatch(query)
+
+    session.on_ended(_end_live_refresh)
+
+    def _snapshot_version():
+        query = live_query.get()
+        return (query, snapshot_store.version(query)) if query is not None else None
+
+    @reactive.poll(_snapshot_version, 1)
+    def live_snapshot():
+        query = live_query.get()
+        return snapshot_store.latest(query) if query is not None else None
+
+    @reactive.effect
+    def _apply_live_snapshot():
+        snap = live_snapshot()
+        if snap is None:
+            return
+
+        spot_price_data.set(snap.spot)
+        option_data.set(snap.chain)
+        surface_data.set(snap.surface)
+        exchange_time_data.set(snap.fetched_at.strftime("%Y-%m-%d %H:%M:%S"))
+
+        with reactive.isolate():
+            rerun_analysis = arbitrage_data.get() is not None
+            rf_rate = input.risk_free_rate() / 100.0
+            threshold = input.arb_threshold() / 100.0
+        if rerun_analysis:
+            if snap.surface is None:
+                arbitrage_data.set(None)
+            elif (rf_rate, threshold) == (refresh_daemon.risk_free_rate, refresh_daemon.threshold):
+                arbitrage_data.set(snap.analysis)
+            else:
+                with metrics.time("analyze_arbitrage", snap.query.underlying):
+                    arbitrage_data.set(analyze_arbitrage(snap.surface, rf_rate, threshold))
+            selected_arb_row.set(None)
+
+    @render.text
+    def snapshot_status():
+        query = live_query.get()
+        req(query is not None)
+        snap = live_snapshot()
+        if snap is None:
+            return "Live refresh: waiting for the first snapshot..."
+        error = refresh_daemon.errors.get(query)
+        status = (
+            f"Live refresh: snapshot v{snap.version} from {snap.fetched_at:%H:%M:%S}, "
+            f"every {refresh_daemon.interval:.0f}s"
+        )
+        return f"{status} (last refresh failed: {error})" if error else status
+
+    @reactive.effect
+    @reactive.event(input.scan_watchlist)
+    def _scan_watchlist():
+        underlyings = list(input.watchlist())
+        req(underlyings)
+        # cleared boxes fall back to their defaults instead of failing the scan
+        band = numeric_input(input.watchlist_band(), 20, 1, 100)
+        rate = numeric_input(input.watchlist_rate_limit(), 10, 1, 100)
+
+        result = scan_underlyings(
+            underlyings,
+            min_expiry=input.watchlist_min_expiry(),
+            max_expiry=input.watchlist_max_expiry(),
+            strike_band=band / 100.0,
+            risk_free_rate=input.risk_free_rate() / 100.0,
+            threshold=input.arb_threshold() / 100.0,
+            contracts=calc_contracts.get(),
+            commission=calc_commission.get(),
+            slippage_pct=calc_slippage_pct.get(),
+            requests_per_second=rate,
+            cache=chain_cache,
+        )
+        for ric, error in result.errors.items():
+            print(f"Error scanning {ric}: {error}")
+        watchlist_data.set(result)
+
+    @render.text
+    def watchlist_summary():
+        result = watchlist_data.get()
+        req(result is not None)
+        df = result.opportunities
+        slowest = max(result.timings.values(), default=0.0)
+        text = (
+            f"Found {len(df)} opportunities across {df['Underlying'].nunique() if not df.empty else 0} underlyings "
+            f"in {result.elapsed:.1f}s (slowest single underlying {slowest:.1f}s)"
+        )
+        if result.errors:
+            text += f". Failed: {', '.join(result.errors)}"
+        return text
+
+    @render.data_frame
+    def watchlist_table():
+        result = watchlist_data.get()
+        req(result is not None and not result.opportunities.empty)
+
+        display_df = result.opportunities[
+            ["Underlying", "K", "ExpiryDate", "strategy_type", "implied_r", "r_diff", "net_pnl", "annualized_return"]
+        ].copy()
+        display_df["K"] = display_df["K"].apply(lambda x: f"${x:.0f}")
+        display_df["ExpiryDate"] = pd.to_datetime(display_df["ExpiryDate"]).dt.strftime('%Y-%m-%d')
+        display_df["implied_r"] = display_df["implied_r"].apply(lambda x: f"{x * 100:.2f}%")
+        display_df["r_diff"] = display_df["r_diff"].apply(lambda x: f"{x * 100:.2f}%")
+        display_df["net_pnl"] = display_df["net_pnl"].apply(lambda x: f"${x:,.2f}")
+        display_df["annualized_return"] = display_df["annualized_return"].apply(lambda x: f"{x:.2f}%")
+
+        display_df.columns = ["Underlying", "Strike", "Expiry", "Strategy", "Implied r", "Rate Diff", "Net P&L", "Annualized"]
+
+        return render.DataGrid(display_df, height="500px")
+
+    @render.text
+    def diagnostics_summary():
+        reactive.invalidate_later(2)
+        chain_stats = chain_cache.stats()
+        analysis_stats = analysis_cache.stats()
+        refresh_stats = refresh_daemon.stats()
+        surface_stats = surface_engine.stats()
+        lseg_stats = request_executor.stats()
+        return (
+            f"Chain cache: {chain_stats['hits']} hits / {chain_stats['misses']} misses | "
+            f"Analysis cache: {analysis_stats['hits']} hits / {analysis_stats['misses']} misses | "
+            f"Surface layouts: {surface_stats['hits']} hits / {surface_stats['misses']} misses | "
+            f"Refresh: {refresh_stats['watched']} watched, {refresh_stats['cycles']} cycles, "
+            f"last {refresh_stats['last_cycle']:.1f}s | "
+            f"LSEG sessions: {session_manager.refs} refs, {session_manager.reconnects} reconnects | "
+            f"LSEG requests: {lseg_stats['calls']} calls, {lseg_stats['retries']} retries, "
+            f"{lseg_stats['timeouts']} timeouts, breaker {lseg_stats['breaker']}"
+        )
+
+    @render.text
+    def session_memory():
+        report = memory_report(
+            chain=option_data.get(),
+            surface=surface_data.get(),
+            analysis=arbitrage_data.get(),
+        ).set_index("frame")["mb"]
+        return "Session data: " + ", ".join(f"{name} {mb:.2f} MB" for name, mb in report.items())
+
+    @render.data_frame
+    def latency_table():
+        reactive.invalidate_later(2)
+        df = metrics.summary()
+        req(not df.empty)
+        for c in ["mean_ms", "p50_ms", "p95_ms", "p99_ms", "last_ms"]:
+            df[c] = df[c].round(1)
+        df.columns = ["Stage", "Underlying", "Count", "Mean (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Last (ms)"]
+        return render.DataGrid(df, height="500px")
+
     @render.text
     def arb_summary():
         df = arbitrage_data.get()
@@ -592,11 +715,52 @@ def server(input, output, session):
             return "No arbitrage opportunities detected."
         return f"Found {len(df)} arbitrage opportunities across {df['K'].nunique()} strikes"
 
-    @render.data_frame
-    def options_table():
+    @reactive.calc
+    def chain_table():
+        # sort orders and filter masks are built once per chain, then reused for every page
         df = option_data.get()
         req(df is not None)
-        return df
+        return PagedTable(df)
+
+    @reactive.calc
+    def chain_view():
+        return TableView(
+            text=input.chain_filter() or "",
+            option_type=input.chain_type() or None,
+            sort_by=input.chain_sort() or None,
+            descending=input.chain_descending(),
+            page=input.chain_page() or 1,
+            page_size=int(input.chain_page_size()),
+        )
+
+    @reactive.calc
+    def chain_page():
+        return chain_table().page(chain_view())
+
+    @reactive.effect
+    @reactive.event(input.chain_filter, input.chain_type, input.chain_sort, input.chain_descending, input.chain_page_size)
+    def _reset_chain_page():
+        ui.update_numeric("chain_page", value=1)
+
+    @reactive.effect
+    @reactive.event(input.chain_prev)
+    def _prev_chain_page():
+        ui.update_numeric("chain_page", value=max(1, chain_page().page - 1))
+
+    @reactive.effect
+    @reactive.event(input.chain_next)
+    def _next_chain_page():
+        page = chain_page()
+        ui.update_numeric("chain_page", value=min(page.pages, page.page + 1))
+
+    @render.text
+    def chain_page_status():
+        return chain_page().describe()
+
+    @render.data_frame
+    def options_table():
+        # only the visible window goes to the browser
+        return render.DataGrid(chain_page().rows, height="500px")
 
     @reactive.effect
     @reactive.event(input.analyze_arb)
@@ -607,7 +771,8 @@ def server(input, output, session):
         rf_rate = input.risk_free_rate() / 100.0
         threshold = input.arb_threshold() / 100.0
 
-        arb_df = analyze_arbitrage(surf, rf_rate, threshold)
+        with metrics.time("analyze_arbitrage", input.underlying_ric()):
+            arb_df = analyze_arbitrage(surf, rf_rate, threshold)
         arbitrage_data.set(arb_df)
         selected_arb_row.set(None)
 
@@ -616,19 +781,22 @@ def server(input, output, session):
         df = arbitrage_data.get()
         req(df is not None and not df.empty)
 
-        display_df = df.copy()
-        display_df["Strategy"] = display_df["signal"].apply(get_strategy_summary)
-        display_df = display_df[["K", "T", "ExpiryDate", "Strategy", "implied_r", "r_diff", "C_mid", "P_mid"]]
-
-        display_df["T"] = display_df["T"].apply(lambda x: f"{x:.4f}")
-        display_df["implied_r"] = display_df["implied_r"].apply(lambda x: f"{x * 100:.2f}%")
-        display_df["r_diff"] = display_df["r_diff"].apply(lambda x: f"{x * 100:.2f}%")
-        display_df["C_mid"] = display_df["C_mid"].apply(lambda x: f"${x:.2f}")
-        display_df["P_mid"] = display_df["P_mid"].apply(lambda x: f"${x:.2f}")
-        display_df["ExpiryDate"] = pd.to_datetime(display_df["ExpiryDate"]).dt.strftime('%Y-%m-%d')
-        display_df["K"] = display_df["K"].apply(lambda x: f"${x:.0f}")
+        costs = execution_costs_batch(
+            df, calc_contracts.get(), calc_commission.get(), calc_slippage_pct.get(), input.risk_free_rate() / 100.0
+        )
 
-        display_df.columns = ["Strike", "Years", "Expiry", "Strategy", "Implied r", "Rate Diff", "Call", "Put"]
+        # Formatted straight from the cached analysis columns; the shared frame itself is never copied.
+        display_df = pd.DataFrame({
+            "Strike": df["K"].map("${:.0f}".format),
+            "Years": df["T"].map("{:.4f}".format),
+            "Expiry": df["ExpiryDate"].dt.strftime('%Y-%m-%d'),
+            "Strategy": costs["strategy_type"],
+            "Implied r": (df["implied_r"] * 100).map("{:.2f}%".format),
+            "Rate Diff": (df["r_diff"] * 100).map("{:.2f}%".format),
+            "Call": df["C_mid"].map("${:.2f}".format),
+            "Put": df["P_mid"].map("${:.2f}".format),
+            "Net P&L": costs["net_pnl"].map("${:,.2f}".format),
+        })
 
         return render.DataGrid(
             display_df,
@@ -913,92 +1081,138 @@ def server(input, output, session):
             )
         )
 
-    @render.ui
-    def surface_plot():
+    @reactive.calc
+    def surface_grids():
+        """Interpolated surface for the current analysis, or the message to show instead."""
         surf = surface_data.get()
         arb_df = arbitrage_data.get()
 
         if surf is None:
-            return ui.div(
+            return {"message": ui.div(
                 {"class": "empty-state"},
                 ui.h5("No Data Available"),
                 ui.p("Please scan options first by clicking 'SCAN OPTIONS CHAIN' in the Market Data tab."),
-            )
+            )}
 
         if arb_df is None or arb_df.empty:
-            return ui.div(
+            return {"message": ui.div(
                 {"class": "empty-state"},
                 ui.h5("No Arbitrage Data"),
                 ui.p("Click 'ANALYZE ARBITRAGE' in the Analysis tab to generate the surface."),
-            )
+            )}
 
-        K_vals = arb_df["K"].values
-        T_vals = arb_df["T"].values
-        r_vals = arb_df["implied_r"].values
+        # every pair rather than only the flagged ones, so the point layout survives a refresh
+        pairs = analysis_cache.paired(surf)
+        pairs = pairs[np.isfinite(pairs["implied_r"].to_numpy())]
+        K_vals = pairs["K"].values
+        T_vals = pairs["T"].values
+        r_vals = pairs["implied_r"].values
 
         if len(K_vals) < 3:
-            return ui.div({"class": "empty-state"}, "Insufficient data points for 3D surface. Need more strike/expiry combinations.")
+            return {"message": ui.div({"class": "empty-state"}, "Insufficient data points for 3D surface. Need more strike/expiry combinations.")}
 
         K_unique = np.sort(np.unique(K_vals))
         T_unique = np.sort(np.unique(T_vals))
 
         if len(K_unique) < 2 or len(T_unique) < 2:
-            return ui.div({"class": "empty-state"}, "Need at least 2 different strikes and 2 different expiries for surface plot.")
+            return {"message": ui.div({"class": "empty-state"}, "Need at least 2 different strikes and 2 different expiries for surface plot.")}
 
-        K_grid, T_grid = np.meshgrid(
-            np.linspace(K_unique.min(), K_unique.max(), 30),
-            np.linspace(T_unique.min(), T_unique.max(), 30)
-        )
+        with reactive.isolate():
+            ric = input.underlying_ric()
 
         try:
-            r_grid = interpolate.griddata(
-                (K_vals, T_vals), r_vals, (K_grid, T_grid), method='cubic', fill_value=np.nan
-            )
+            with metrics.time("surface_interpolation", ric):
+                K_grid, T_grid, r_grid = surface_engine.interpolate(K_vals, T_vals, r_vals)
+        except Exception as e:
+            return {"message": ui.div({"class": "empty-state"}, f"Error creating surface plot: {str(e)}")}
 
-            r_grid_pct = r_grid * 100
-            T_grid_days = T_grid * 365
-
-            fig = go.Figure(data=[go.Surface(
-                x=K_grid,
-                y=T_grid_days,
-                z=r_grid_pct,
-                colorscale='Viridis',
-                colorbar=dict(title="Implied r, % ann")
-            )])
-
-            fig.update_traces(
-                hovertemplate='<b>Strike:</b> $%{x:.0f}<br>' +
-                              '<b>Days to Expiry:</b> %{y:.1f}<br>' +
-                              '<b>Implied r:</b> %{z:.2f}% ann<br>' +
-                              '<extra></extra>'
-            )
+        return {"message": None, "ric": ric, "x": K_grid, "y": T_grid * 365, "z": r_grid * 100}
 
-            # Deep-blue styling for Plotly
-            fig.update_layout(
-                title="Implied Risk-Free Rate Surface",
-                scene=dict(
-                    xaxis_title="Strike Price ($)",
-                    yaxis_title="Time to Expiry (Days)",
-                    zaxis_title="Implied r, % ann",
-                    camera=dict(eye=dict(x=1.5, y=1.5, z=1.3)),
-                    xaxis=dict(tickprefix="$"),
-                    zaxis=dict(ticksuffix="%"),
-                    bgcolor="#0f1e33",
-                ),
-                template="plotly_dark",
-                paper_bgcolor="#0b1220",
-                font=dict(color="#e8eefc"),
-                height=600,
-                margin=dict(l=0, r=0, t=40, b=0)
-            )
+    @render.ui
+    def surface_status():
+        return surface_grids()["message"]
 
-            return ui.HTML(fig.to_html(include_plotlyjs="cdn", full_html=False))
+    @render_plotly
+    def surface_plot():
+        # Built once per session; later data only patches the trace in _update_surface
+        with reactive.isolate():
+            grids = surface_grids()
+        has_data = grids["message"] is None
+
+        fig = go.FigureWidget(data=[go.Surface(
+            x=grids["x"] if has_data else None,
+            y=grids["y"] if has_data else None,
+            z=grids["z"] if has_data else None,
+            visible=has_data,
+            colorscale='Viridis',
+            colorbar=dict(title="Implied r, % ann")
+        )])
+
+        fig.update_traces(
+            hovertemplate='<b>Strike:</b> $%{x:.0f}<br>' +
+                          '<b>Days to Expiry:</b> %{y:.1f}<br>' +
+                          '<b>Implied r:</b> %{z:.2f}% ann<br>' +
+                          '<extra></extra>'
+        )
 
-        except Exception as e:
-            return ui.div({"class": "empty-state"}, f"Error creating surface plot: {str(e)}")
+        # Deep-blue styling for Plotly
+        fig.update_layout(
+            title="Implied Risk-Free Rate Surface",
+            scene=dict(
+                xaxis_title="Strike Price ($)",
+                yaxis_title="Time to Expiry (Days)",
+                zaxis_title="Implied r, % ann",
+                camera=dict(eye=dict(x=1.5, y=1.5, z=1.3)),
+                xaxis=dict(tickprefix="$"),
+                zaxis=dict(ticksuffix="%"),
+                bgcolor="#0f1e33",
+            ),
+            # a constant uirevision keeps the user's camera across data updates
+            uirevision="surface",
+            template="plotly_dark",
+            paper_bgcolor="#0b1220",
+            font=dict(color="#e8eefc"),
+            height=600,
+            margin=dict(l=0, r=0, t=40, b=0)
+        )
+        return fig
 
+    @reactive.effect
+    def _update_surface():
+        grids = surface_grids()
+        widget = surface_plot.widget
+        trace = widget.data[0]
+
+        if grids["message"] is not None:
+            trace.visible = False
+            return
+
+        update_start = time.perf_counter()
+        # Plotly only sends properties whose value changed, so an unchanged
+        # strike/expiry grid costs nothing and a quote refresh ships just z.
+        with widget.batch_update():
+            trace.x = grids["x"]
+            trace.y = grids["y"]
+            trace.z = grids["z"]
+            trace.visible = True
+        metrics.observe("surface_plot", time.perf_counter() - update_start, grids["ric"])
+
+
+shiny_app = App(app_ui, server)
 
-app = App(app_ui, server)
+
+async def metrics_endpoint(request):
+    text = metrics.prometheus_text() + request_executor.prometheus_text()
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
+# /metrics for Prometheus next to the Shiny app; `shiny run app.py` serves both
+app = Starlette(routes=[
+    Route("/metrics", metrics_endpoint),
+    Mount("/", app=shiny_app),
+])
 
 if __name__ == "__main__":
-    app.run()
+    import uvicorn
+
+    uvicorn.run(app)
@@ -0,0 +1,179 @@
+"""
+Offline benchmarks for the analysis hot paths.
+
+Runs compact_chain (ingest), build_surface_df, analyze_arbitrage (cold AnalysisCache),
+execution_costs_batch, calculate_execution_costs, the Black-Scholes implied
+volatility solve and Greeks of every contract, and the surface
+interpolation (griddata, and SurfaceEngine on a new and on an already seen
+strike/expiry layout) on synthetic chains, records the median wall time and the
+tracemalloc peak of each, and compares them with benchmarks/baseline.json.
+
+    python benchmarks/bench_analysis.py                    # compare, exit 1 on regression
+    python benchmarks/bench_analysis.py --update-baseline  # record a new baseline
+    python benchmarks/bench_analysis.py --sizes 1000 10000 --tolerance 0.5
+
+Baselines are machine specific; record one on the machine you compare on.
+No LSEG session is needed.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from deviltongues.analysis_cache import AnalysisCache
+from deviltongues.black_scholes import black_scholes_price, greeks, implied_volatility
+from deviltongues.chain import build_surface_df
+from deviltongues.execution import calculate_execution_costs, execution_costs_batch
+from deviltongues.schema import compact_chain
+from deviltongues.surface import SurfaceEngine, interpolate_rate_surface
+from deviltongues.synthetic import ChainSpec, generate_chain
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+SIZES = [1_000, 10_000, 100_000]
+SPOT = 100.0
+RISK_FREE_RATE = 0.05
+THRESHOLD = 0.005
+SCALAR_ROWS = 1_000  # calculate_execution_costs is per row; time a fixed slice of rows
+CHAIN_SPEC = ChainSpec(spot=SPOT, expiries=20, strike_range=(0.5, 1.5), violation_rate=0.25)
+
+
+def make_chain(contracts: int) -> pd.DataFrame:
+    # a quarter of the pairs violate parity, so the signal-dependent stages have real work
+    return generate_chain(CHAIN_SPEC.sized(contracts), seed=0)
+
+
+def _stages(raw: pd.DataFrame) -> dict:
+    # the stages after ingest see the chain as fetch_option_chain returns it
+    chain = compact_chain(raw)
+    surface = build_surface_df(chain, SPOT)
+    arb = AnalysisCache().analyze(surface, RISK_FREE_RATE, THRESHOLD)
+    rows = [row for _, row in arb.head(SCALAR_ROWS).iterrows()]
+    K, T, r = arb["K"].to_numpy(), arb["T"].to_numpy(), arb["implied_r"].to_numpy()
+    engine = SurfaceEngine()
+    engine.interpolate(K, T, r)
+    # a refresh: same strikes and expiries, new rates
+    refreshed = r + np.random.default_rng(0).normal(0, 1e-3, r.size)
+
+    # model prices at a smile of known volatilities, so every contract has a solution to find
+    strikes, years = surface["K"].to_numpy(np.float64), surface["T"].to_numpy(np.float64)
+    calls = (surface["CallPutOption"] == "Call").to_numpy()
+    vols = 0.2 + 0.3 * (np.log(strikes / SPOT)) ** 2
+    prices = black_scholes_price(SPOT, strikes, years, RISK_FREE_RATE, vols, call=calls)
+
+    return {
+        "compact_chain": lambda: compact_chain(raw),
+        "build_surface_df": lambda: build_surface_df(chain, SPOT),
+        "analyze_arbitrage": lambda: AnalysisCache().analyze(surface, RISK_FREE_RATE, THRESHOLD),
+        "execution_costs_batch": lambda: execution_costs_batch(arb, 10, 5.0, 0.5, RISK_FREE_RATE),
+        "calculate_execution_costs": lambda: [calculate_execution_costs(r, 10, 5.0, 0.5, RISK_FREE_RATE) for r in rows],
+        "implied_volatility": lambda: implied_volatility(prices, SPOT, strikes, years, RISK_FREE_RATE, call=calls),
+        "greeks": lambda: greeks(SPOT, strikes, years, RISK_FREE_RATE, vols, call=calls),
+        "surface_interpolation": lambda: interpolate_rate_surface(K, T, r),
+        "surface_engine_cold": lambda: SurfaceEngine().interpolate(K, T, r),
+        "surface_engine_refresh": lambda: engine.interpolate(K, T, refreshed),
+    }
+
+
+def measure(fn, repeat: int) -> dict:
+    fn()  # warm up imports and caches outside the timed runs
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"seconds": statistics.median(times), "peak_mb": peak / 2**20}
+
+
+def run(sizes, repeat: int) -> dict:
+    results = {}
+    for size in sizes:
+        chain = make_chain(size)
+        for stage, fn in _stages(chain).items():
+            key = f"{stage}/{size}"
+            results[key] = measure(fn, repeat if size < 100_000 else max(1, repeat // 2))
+            print(f"{key:<36} {results[key]['seconds'] * 1000:10.2f} ms {results[key]['peak_mb']:10.2f} MB")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float, min_seconds: float) -> list[str]:
+    failures = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<36} no baseline")
+            continue
+        slower = result["seconds"] > base["seconds"] * (1 + tolerance) and result["seconds"] - base["seconds"] > min_seconds
+        bigger = result["peak_mb"] > base["peak_mb"] * (1 + memory_tolerance) and result["peak_mb"] - base["peak_mb"] > 0.5
+        status = "FAIL" if slower or bigger else "ok"
+        print(
+            f"{key:<36} {result['seconds'] / base['seconds']:6.2f}x time "
+            f"{result['peak_mb'] / max(base['peak_mb'], 1e-9):6.2f}x memory  {status}"
+        )
+        if slower:
+            failures.append(f"{key}: {result['seconds'] * 1000:.2f} ms vs baseline {base['seconds'] * 1000:.2f} ms")
+        if bigger:
+            failures.append(f"{key}: {result['peak_mb']:.2f} MB vs baseline {base['peak_mb']:.2f} MB")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional slowdown")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="allowed fractional peak-memory growth")
+    parser.add_argument("--min-seconds", type=float, default=0.002, help="ignore slowdowns smaller than this")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeat)
+
+    if args.update_baseline:
+        stored = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+        stored.update(results)
+        args.baseline.write_text(json.dumps({
+            "machine": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "results": stored,
+        }, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 1
+
+    failures = compare(
+        results,
+        json.loads(args.baseline.read_text())["results"],
+        args.tolerance,
+        args.memory_tolerance,
+        args.min_seconds,
+    )
+    for failure in failures:
+        print(f"Regression: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
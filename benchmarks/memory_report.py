@@ -0,0 +1,79 @@
+"""
+Per-session memory footprint of one analysed chain, before and after the
+compact schema.
+
+"before" is the layout the app held until the compact schema: the chain as
+returned by the vendor (object strings, float64), a surface frame repeating
+StrikePrice/K and S on every row, and a call/put merge carrying suffixed
+copies of every column. "after" is what fetch_option_chain,
+build_surface_df and pair_calls_puts produce now.
+
+    python benchmarks/memory_report.py                 # 10k contracts
+    python benchmarks/memory_report.py --contracts 100000
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+import pandas as pd
+
+from deviltongues.chain import build_surface_df
+from deviltongues.parity import apply_signals, implied_rate, pair_calls_puts
+from deviltongues.schema import compact_chain, memory_report
+from deviltongues.synthetic import ChainSpec, generate_chain
+
+SPOT = 100.0
+RISK_FREE_RATE = 0.05
+THRESHOLD = 0.005
+
+
+def legacy_frames(chain: pd.DataFrame, spot: float) -> dict:
+    """The pre-schema surface, pair and flagged frames, rebuilt for comparison."""
+    surface = chain.copy()
+    surface["mid"] = surface[["Bid", "Ask"]].mean(axis=1)
+    surface.loc[surface["mid"].isna(), "mid"] = surface["Last"]
+    surface["T"] = (surface["ExpiryDate"] - pd.Timestamp.now()).dt.days / 365.0
+    surface["K"] = surface["StrikePrice"]
+    surface["S"] = spot
+    surface = surface[["RIC", "K", "T", "mid", "S", "StrikePrice", "ExpiryDate", "CallPutOption"]]
+
+    calls = surface[surface["CallPutOption"] == "Call"]
+    puts = surface[surface["CallPutOption"] == "Put"]
+    paired = calls.merge(puts, on=["K", "T", "S", "ExpiryDate"], suffixes=("_call", "_put"))
+    paired["C_mid"] = paired["mid_call"]
+    paired["P_mid"] = paired["mid_put"]
+    paired["implied_r"] = implied_rate(spot, paired["C_mid"], paired["P_mid"], paired["K"], paired["T"])
+    r_diff = paired["implied_r"] - RISK_FREE_RATE
+    flagged = paired[r_diff.abs() > THRESHOLD].copy()
+    flagged["r_diff"] = r_diff[flagged.index]
+    return {"chain": chain, "surface": surface, "paired": paired, "flagged": flagged}
+
+
+def compact_frames(chain: pd.DataFrame, spot: float) -> dict:
+    chain = compact_chain(chain)
+    surface = build_surface_df(chain, spot)
+    paired = pair_calls_puts(surface)
+    flagged = apply_signals(paired, RISK_FREE_RATE, THRESHOLD)
+    return {"chain": chain, "surface": surface, "paired": paired, "flagged": flagged}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=10_000)
+    args = parser.parse_args(argv)
+
+    raw = generate_chain(ChainSpec(spot=SPOT, violation_rate=0.25).sized(args.contracts), seed=0)
+    before = memory_report(**legacy_frames(raw, SPOT))
+    after = memory_report(**compact_frames(raw, SPOT))
+
+    report = before.merge(after, on="frame", suffixes=("_before", "_after"))
+    report["saved"] = 1 - report["mb_after"] / report["mb_before"]
+    pd.set_option("display.width", 120)
+    print(f"Per-session footprint of a {len(raw):,}-contract chain (MB, shared objects counted once)")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Wall-clock time of fetch_quotes against a stand-in vendor with injected
+latency, for increasing worker counts.
+
+Every batch costs one round trip of `--latency` seconds, so with one worker
+the fetch takes about batches x latency and with N workers about 1/N of
+that; "speedup" is the time with one worker over the time with N.
+
+    python benchmarks/quote_latency.py                  # 10k RICs, exit 1 if 8 workers are under --min-speedup
+    python benchmarks/quote_latency.py --rics 2500 --latency 0.2 --workers 1 2 4
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from deviltongues.providers import LatencyProvider
+from deviltongues.quotes import fetch_quotes
+from deviltongues.synthetic import ChainSpec, generate_chain
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rics", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=250)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per get_data call")
+    parser.add_argument("--jitter", type=float, default=0.01, help="up to this many seconds more per call")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--min-speedup", type=float, default=3.0, help="fail when the most workers are not this much faster than one")
+    args = parser.parse_args(argv)
+
+    rics = generate_chain(ChainSpec().sized(args.rics), seed=0)["RIC"].tolist()
+    print(f"{len(rics):,} RICs in batches of {args.batch_size}, {args.latency * 1000:.0f} ms (+{args.jitter * 1000:.0f} ms) per call")
+
+    baseline = None
+    for workers in sorted(args.workers):
+        provider = LatencyProvider(latency=args.latency, jitter=args.jitter)
+        result = fetch_quotes(rics, get_data=provider.get_data, batch_size=args.batch_size, max_workers=workers)
+        if result.failures or len(result.prices) != len(rics):
+            print(f"{workers} workers: {len(result.failures)} failed batches, {len(result.prices)} of {len(rics)} quotes")
+            return 1
+        baseline = baseline or result.elapsed
+        speedup = baseline / result.elapsed
+        print(f"{workers:>3} workers  {result.elapsed:7.3f} s   speedup {speedup:5.2f}x   {provider.peak_concurrency} calls in flight at most")
+
+    if speedup < args.min_speedup:
+        print(f"Regression: {workers} workers are only {speedup:.2f}x faster than {sorted(args.workers)[0]}, below {args.min_speedup:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Peak memory of one scan, from the vendor frames to the flagged pairs, as a
+multiple of the chain it produces.
+
+A scan starts from what discovery and the quote batches hand over (the
+discovery rows and one quote frame, both object/float64 as the vendor
+returns them) and runs compact_chain, build_surface_df and a cold
+AnalysisCache.analyze. Python allocations are traced with tracemalloc and
+Arrow buffers (RIC strings) through the Arrow memory pool, so both count; the
+two peaks are added, which slightly overstates the combined peak.
+
+"chains" divides by the size of the compact chain the scan returns, so
+1.0 is one extra copy of the chain on top of the inputs.
+
+    python benchmarks/scan_memory.py                     # 100k contracts, exit 1 above --max-chains
+    python benchmarks/scan_memory.py --contracts 10000 --max-chains 2.5
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import pyarrow as pa
+
+from deviltongues.analysis_cache import AnalysisCache
+from deviltongues.chain import build_surface_df
+from deviltongues.chain_search import CHAIN_FIELDS
+from deviltongues.schema import compact_chain, memory_report
+from deviltongues.synthetic import ChainSpec, generate_chain
+
+SPOT = 100.0
+RISK_FREE_RATE = 0.05
+THRESHOLD = 0.005
+
+
+class _Tracker:
+    """
+    tracemalloc plus the default Arrow pool, both measured from the same mark.
+
+    Arrow's pool only keeps an all-time high-water mark, so a stage's Arrow
+    peak is that mark when the stage raised it and its net growth otherwise.
+    """
+
+    def __init__(self):
+        self.pool = pa.default_memory_pool()
+
+    def __enter__(self):
+        gc.collect()
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc):
+        tracemalloc.stop()
+
+    def mark(self) -> tuple[int, int, int]:
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0], self.pool.bytes_allocated(), self.pool.max_memory()
+
+    def since(self, mark: tuple[int, int, int]) -> tuple[float, float]:
+        """(retained, peak) MB since `mark`."""
+        traced, arrow, arrow_high = mark
+        current, peak = tracemalloc.get_traced_memory()
+        grown = self.pool.bytes_allocated() - arrow
+        arrow_peak = self.pool.max_memory() - arrow if self.pool.max_memory() > arrow_high else max(grown, 0)
+        return (current - traced + grown) / 2**20, (peak - traced + arrow_peak) / 2**20
+
+
+def vendor_frames(contracts: int):
+    raw = generate_chain(ChainSpec(spot=SPOT, violation_rate=0.25).sized(contracts), seed=0)
+    discovery = raw[CHAIN_FIELDS].copy()
+    prices = raw[["RIC", "Bid", "Ask", "Last"]].reset_index(drop=True)  # fetch_quotes keeps the request order
+    return discovery, prices
+
+
+def run(contracts: int) -> tuple[list[dict], float]:
+    discovery, prices = vendor_frames(contracts)
+    rows = []
+    with _Tracker() as tracker:
+        start = tracker.mark()
+
+        mark = tracker.mark()
+        chain = compact_chain(discovery, prices)
+        rows.append(("compact_chain", *tracker.since(mark)))
+
+        mark = tracker.mark()
+        surface = build_surface_df(chain, SPOT)
+        rows.append(("build_surface_df", *tracker.since(mark)))
+
+        mark = tracker.mark()
+        analysis = AnalysisCache().analyze(surface, RISK_FREE_RATE, THRESHOLD)
+        rows.append(("analyze_arbitrage", *tracker.since(mark)))
+
+        # stage peaks are measured from their own start; the scan peak from the very beginning
+        retained, _ = tracker.since(start)
+        scan_peak = max(
+            sum(r[1] for r in rows[:i]) + rows[i][2] for i in range(len(rows))
+        )
+        rows.append(("scan", retained, scan_peak))
+
+    chain_mb = memory_report(chain=chain)["mb"].iloc[0]
+    return [{"stage": s, "retained_mb": r, "peak_mb": p, "chains": p / chain_mb} for s, r, p in rows], chain_mb
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=100_000)
+    parser.add_argument("--max-chains", type=float, default=2.0, help="fail when the scan peak exceeds this many chains")
+    args = parser.parse_args(argv)
+
+    rows, chain_mb = run(args.contracts)
+    print(f"Scan of {args.contracts:,} contracts; the compact chain is {chain_mb:.2f} MB")
+    for row in rows:
+        print(f"{row['stage']:<20} retained {row['retained_mb']:8.2f} MB   peak {row['peak_mb']:8.2f} MB {row['chains']:6.2f} chains")
+
+    scan = rows[-1]
+    if scan["chains"] > args.max_chains:
+        print(f"Regression: scan peak is {scan['chains']:.2f} chains, above {args.max_chains:.2f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
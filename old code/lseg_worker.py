@@ -1,14 +1,15 @@
 # src/lseg_worker.py
 from datetime import datetime, date
 
-import eikon as ek
 import pandas as pd
 from fastapi import FastAPI
 
+from deviltongues.providers import EikonProvider, provider_from_env
+
 app = FastAPI()
 
 # 🔑 这里填你的真实 APP KEY
-ek.set_app_key("06dbeb8bdea345b49d0e9f917a1a124250aedf25")
+provider = provider_from_env(default=EikonProvider("06dbeb8bdea345b49d0e9f917a1a124250aedf25"))
 
 FIELDS = [
     "PUTCALLIND",
@@ -28,7 +29,7 @@ def fetch(symbol: str):
     """
     try:
         # ---------- 1. 标的现价 ----------
-        spot_df, _ = ek.get_data(f"{symbol}.O", ["TRDPRC_1"])
+        spot_df = provider.get_data(f"{symbol}.O", ["TRDPRC_1"])
         spot = None
         if spot_df is not None and "TRDPRC_1" in spot_df.columns:
             vals = spot_df["TRDPRC_1"].dropna().values
@@ -37,10 +38,7 @@ def fetch(symbol: str):
 
         # ---------- 2. 期权链 ----------
         ric = f"0#{symbol.upper()}*.U"
-        df, err = ek.get_data(ric, fields=FIELDS)
-
-        if err:
-            print("Worker ERR:", err)
+        df = provider.get_data(ric, fields=FIELDS)
 
         if df is None or df.empty:
             return {"success": True, "symbol": symbol, "data": []}
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+SQRT_2PI = np.sqrt(2 * np.pi)
+MAX_VOLATILITY = 10.0  # upper end of the solver's bracket, 1000% a year
+
+
+def _inputs(*arrays) -> list[np.ndarray]:
+    return np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in arrays))
+
+
+def _is_call(call, shape) -> np.ndarray:
+    """True/False, an array of them, or "Call"/"Put" strings (any case) broadcast to `shape`."""
+    call = np.asarray(call)
+    if call.dtype.kind in "OUS":
+        call = np.char.lower(call.astype(str)) == "call"
+    return np.broadcast_to(call.astype(bool), shape)
+
+
+def _pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def black_scholes_price(S, K, T, r, sigma, q=0.0, call=True) -> np.ndarray:
+    """
+    Black-Scholes-Merton price of European options with a continuous dividend
+    yield `q`. Inputs broadcast against each other; rates and volatilities are
+    annual decimals, T in years. NaN where T, sigma, S or K is not positive.
+    """
+    S, K, T, r, sigma, q = _inputs(S, K, T, r, sigma, q)
+    is_call = _is_call(call, S.shape)
+
+    valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sd = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (r - q) * T) / sd + 0.5 * sd
+        d2 = d1 - sd
+        spot = S * np.exp(-q * T)
+        strike = K * np.exp(-r * T)
+        price = np.where(
+            is_call,
+            spot * ndtr(d1) - strike * ndtr(d2),
+            strike * ndtr(-d2) - spot * ndtr(-d1),
+        )
+    return np.where(valid, price, np.nan)
+
+
+def implied_volatility(price, S, K, T, r, q=0.0, call=True, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """
+    Black-Scholes-Merton implied volatility of whole arrays of option prices.
+
+    Puts are turned into calls by parity, so every point solves the same
+    increasing function of sigma. The start is the Corrado-Miller rational
+    approximation; from there Newton steps are taken while they stay inside
+    a bracket [lo, hi] that shrinks on every evaluation, and a bisection
+    step is taken instead when they leave it or vega vanishes. Only the
+    points still unconverged are evaluated on each pass.
+
+    NaN where the price is outside the no-arbitrage bounds (at or below
+    intrinsic value, at or above the discounted spot) or T, S or K is not
+    positive. `tol` is on the price, relative to the strike.
+    """
+    price, S, K, T, r, q = _inputs(price, S, K, T, r, q)
+    is_call = _is_call(call, S.shape)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        spot = S * np.exp(-q * T)
+        strike = K * np.exp(-r * T)
+        target = np.where(is_call, price, price + spot - strike)  # put-call parity
+        valid = (T > 0) & (S > 0) & (K > 0) & (target > np.maximum(spot - strike, 0)) & (target < spot)
+
+    sigma = np.full(S.shape, np.nan)
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return sigma
+
+    c, s, k, sqrt_t = target.ravel()[idx], spot.ravel()[idx], strike.ravel()[idx], np.sqrt(T.ravel()[idx])
+    log_moneyness = np.log(s / k)
+    scale = tol * k
+
+    # Corrado-Miller (1996); the discriminant goes negative far from the money, so clip it
+    half = c - (s - k) / 2
+    guess = SQRT_2PI / (s + k) * (half + np.sqrt(np.maximum(half * half - (s - k) ** 2 / np.pi, 0.0))) / sqrt_t
+    vol = np.clip(np.nan_to_num(guess, nan=0.2), 1e-3, MAX_VOLATILITY / 2)
+    lo = np.zeros_like(vol)
+    hi = np.full_like(vol, MAX_VOLATILITY)
+
+    active = np.arange(idx.size)
+    out = np.empty(idx.size)
+    for _ in range(max_iter):
+        v = vol[active]
+        sd = v * sqrt_t[active]
+        d1 = log_moneyness[active] / sd + 0.5 * sd
+        s_a, k_a = s[active], k[active]
+        diff = s_a * ndtr(d1) - k_a * ndtr(d1 - sd) - c[active]
+        vega = s_a * _pdf(d1) * sqrt_t[active]
+
+        done = np.abs(diff) <= scale[active]
+        above = diff > 0
+        hi[active] = np.where(above, v, hi[active])
+        lo[active] = np.where(above, lo[active], v)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = v - diff / vega
+        inside = (step > lo[active]) & (step < hi[active])
+        step = np.where(inside, step, 0.5 * (lo[active] + hi[active]))
+        done |= np.abs(step - v) <= 1e-14 * np.maximum(v, 1.0)
+
+        out[active[done]] = np.where(np.abs(diff[done]) <= scale[active[done]], v[done], step[done])
+        vol[active] = step
+        active = active[~done]
+        if active.size == 0:
+            break
+    out[active] = np.nan  # did not converge within max_iter
+
+    sigma.ravel()[idx] = out
+    return sigma
+
+
+@dataclass(frozen=True, eq=False)
+class Greeks:
+    """
+    Per-unit sensitivities: delta and gamma per 1.0 of the underlying, vega
+    per 1.0 (100 points) of volatility, theta per year and rho per 1.0 of
+    the rate.
+    """
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray
+    theta: np.ndarray
+    rho: np.ndarray
+
+    def as_frame(self, index=None) -> pd.DataFrame:
+        return pd.DataFrame({
+            "price": self.price,
+            "delta": self.delta,
+            "gamma": self.gamma,
+            "vega": self.vega,
+            "theta": self.theta,
+            "rho": self.rho,
+        }, index=index)
+
+
+def greeks(S, K, T, r, sigma, q=0.0, call=True) -> Greeks:
+    """Price and first-order Greeks (plus gamma) of European options; NaN where the price is."""
+    S, K, T, r, sigma, q = _inputs(S, K, T, r, sigma, q)
+    is_call = _is_call(call, S.shape)
+
+    valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sqrt_t = np.sqrt(T)
+        sd = sigma * sqrt_t
+        d1 = (np.log(S / K) + (r - q) * T) / sd + 0.5 * sd
+        d2 = d1 - sd
+        spot = S * np.exp(-q * T)
+        strike = K * np.exp(-r * T)
+        density = _pdf(d1)
+        n1, n2 = ndtr(d1), ndtr(d2)
+
+        price = np.where(is_call, spot * n1 - strike * n2, strike * (1 - n2) - spot * (1 - n1))
+        delta = np.where(is_call, np.exp(-q * T) * n1, np.exp(-q * T) * (n1 - 1))
+        gamma = spot * density / (S * S * sd)
+        vega = spot * density * sqrt_t
+        decay = -spot * density * sigma / (2 * sqrt_t)
+        theta = np.where(
+            is_call,
+            decay - r * strike * n2 + q * spot * n1,
+            decay + r * strike * (1 - n2) - q * spot * (1 - n1),
+        )
+        rho = np.where(is_call, T * strike * n2, -T * strike * (1 - n2))
+
+    def masked(a):
+        return np.where(valid, a, np.nan)
+
+    return Greeks(
+        price=masked(price),
+        delta=masked(delta),
+        gamma=masked(gamma),
+        vega=masked(vega),
+        theta=masked(theta),
+        rho=masked(rho),
+    )
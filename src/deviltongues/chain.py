@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from deviltongues.chain_cache import ChainCache
+from deviltongues.chain_search import SEARCH_CAP, ChainQuery, ChainScanResult, scan_chain
+from deviltongues.metrics import metrics
+from deviltongues.providers import get_provider
+from deviltongues.quotes import QuoteFetchResult, fetch_quotes
+from deviltongues.schema import as_datetime, as_option_type, as_ric, compact_chain, expiry_days, mid_price, years_to_expiry
+
+
+def build_surface_df(df: pd.DataFrame, spot: float) -> pd.DataFrame:
+    """
+    Per-contract mid price and time to expiry in the compact SURFACE_DTYPES
+    layout: RIC, CallPutOption, K, ExpiryDay, T, mid, with the spot stored
+    once as `attrs["spot"]`. The mid is the mean of the available bid/ask,
+    else the last price. Contracts without an expiry are dropped.
+
+    For a chain already in CHAIN_DTYPES (fetch_option_chain) the RIC,
+    CallPutOption and K columns are views of the chain's own arrays; only
+    ExpiryDay, T and mid are new. Neither frame may be mutated in place.
+    """
+    expiry = as_datetime(df["ExpiryDate"])
+    keep = expiry.notna().to_numpy()
+    if not keep.all():
+        df, expiry = df[keep], expiry[keep]
+
+    quotes = {
+        c: _float32(df[c]) if c in df else np.full(len(df), np.nan, dtype=np.float32)
+        for c in ("Bid", "Ask", "Last")
+    }
+    mid = mid_price(quotes["Bid"], quotes["Ask"], quotes["Last"])
+
+    days = expiry_days(expiry)
+    surface = pd.DataFrame({
+        "RIC": as_ric(df["RIC"]),
+        "CallPutOption": as_option_type(df["CallPutOption"]),
+        "K": _float32(df["StrikePrice"]),
+        "ExpiryDay": days,
+        "T": years_to_expiry(days, pd.Timestamp.now()),
+        "mid": mid,
+    }, index=df.index, copy=False)
+    surface.attrs["spot"] = float(spot)
+    return surface
+
+
+def _float32(values: pd.Series) -> np.ndarray:
+    """Numeric float32 values, without a copy when the column already is float32."""
+    if values.dtype == np.float32:
+        return values.to_numpy()
+    return pd.to_numeric(values, errors="coerce").to_numpy(np.float32)
+
+
+def fetch_spot(ric: str, get_data=None) -> float:
+    get_data = get_provider().get_data if get_data is None else get_data
+    with metrics.time("spot", ric):
+        df = get_data(ric, fields=["TR.PriceClose"])
+    return float(df["Price Close"].iloc[0])
+
+
+@dataclass
+class ChainFetch:
+    chain: pd.DataFrame  # discovery rows merged with Bid, Ask, Last, in CHAIN_DTYPES
+    scan: ChainScanResult
+    quotes: QuoteFetchResult | None = None
+
+
+def fetch_option_chain(
+        query: ChainQuery,
+        top: int | None = SEARCH_CAP,
+        cache: ChainCache | None = None,
+        search=None,
+        get_data=None,
+        quote_batch_size: int = 250,
+        quote_workers: int = 4) -> ChainFetch:
+    """
+    Discover the contracts in `query` (through `cache` when given) and attach
+    their latest Bid/Ask/Last. `search` and `get_data` are passed through to
+    scan_chain and fetch_quotes.
+    """
+    with metrics.time("chain_discovery", query.underlying):
+        if cache is not None:
+            scan = cache.get_or_scan(query, top=top, search=search)
+        else:
+            scan = scan_chain(query, top=top, search=search)
+    for q in scan.truncated:
+        print(f"Search window still at the {top or SEARCH_CAP}-row cap, results may be incomplete: {q.filter()}")
+
+    chain = scan.chain
+    if chain.empty:
+        return ChainFetch(chain=chain, scan=scan)
+
+    quotes = fetch_quotes(
+        chain["RIC"].astype(str).tolist(),
+        get_data=get_data,
+        batch_size=quote_batch_size,
+        max_workers=quote_workers,
+        underlying=query.underlying,
+    )
+    for failure in quotes.failures:
+        print(f"Error fetching prices for batch {failure.batch} ({len(failure.rics)} RICs): {failure.error}")
+
+    with metrics.time("merge", query.underlying):
+        merged = compact_chain(chain, quotes.prices)
+    return ChainFetch(chain=merged, scan=scan, quotes=quotes)
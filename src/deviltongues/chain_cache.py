@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from deviltongues.chain_search import ChainQuery, ChainScanResult, scan_chain
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("DEVILTONGUES_CACHE_DIR", Path.home() / ".cache" / "deviltongues")
+)
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name)
+
+
+class ChainCache:
+    """
+    On-disk cache of chain metadata (RIC, CallPutOption, StrikePrice,
+    ExpiryDate) from discovery.search, one Parquet file per underlying, strike
+    window and expiry window.
+
+    Entries older than `ttl` are treated as misses. Files are written to a
+    temporary name and moved into place with os.replace, so several app worker
+    processes on one host can share a cache directory without seeing partial
+    files. Hit and miss counts are per process and available from `stats()`.
+    """
+
+    def __init__(self, root: str | Path | None = None, ttl: timedelta | float = timedelta(hours=24)):
+        self.root = Path(root) if root is not None else DEFAULT_CACHE_DIR / "chains"
+        self.ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, query: ChainQuery) -> Path:
+        key = f"{query.exchange}|{query.min_strike}|{query.max_strike}|{query.min_expiry}|{query.max_expiry}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return self.root / _safe_name(query.underlying) / f"{digest}.parquet"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, query: ChainQuery) -> pd.DataFrame | None:
+        path = self.path_for(query)
+        try:
+            fresh = time.time() - path.stat().st_mtime <= self.ttl
+            chain = pd.read_parquet(path) if fresh else None
+        except (FileNotFoundError, OSError):
+            chain = None
+        self._count(chain is not None)
+        return chain
+
+    def put(self, query: ChainQuery, chain: pd.DataFrame) -> None:
+        path = self.path_for(query)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".parquet")
+        os.close(fd)
+        try:
+            chain.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def invalidate(self, underlying: str | None = None, query: ChainQuery | None = None) -> int:
+        """Remove one query's entry, every entry for an underlying, or (with no arguments) everything."""
+        if query is not None:
+            paths = [self.path_for(query)]
+        elif underlying is not None:
+            paths = list((self.root / _safe_name(underlying)).glob("*.parquet"))
+        else:
+            paths = list(self.root.glob("*/*.parquet"))
+
+        removed = 0
+        for path in paths:
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def get_or_scan(self, query: ChainQuery, **scan_kwargs) -> ChainScanResult:
+        """
+        Cached chain for `query`, or a fresh `scan_chain` that is then stored.
+        Scans that left truncated windows are returned but not cached.
+        """
+        chain = self.get(query)
+        if chain is not None:
+            return ChainScanResult(chain=chain)
+
+        result = scan_chain(query, **scan_kwargs)
+        if not result.truncated:
+            self.put(query, result.chain)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "ttl_seconds": self.ttl,
+                "root": str(self.root),
+            }
+
+
+class ExchangeCodeCache:
+    """
+    Underlying -> option exchange codes (OPQ, EUX, HKG, ...) from
+    discovery.search, kept in one JSON file so a known underlying needs no
+    search at all, in this process or the next.
+
+    The file is read once and rewritten on every `put`, merged with what
+    other processes wrote in the meantime and moved into place with
+    os.replace. Entries older than `ttl` are misses.
+    """
+
+    def __init__(self, path: str | Path | None = None, ttl: timedelta | float = timedelta(days=30)):
+        self.path = Path(path) if path is not None else DEFAULT_CACHE_DIR / "exchange_codes.json"
+        self.ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, OSError, ValueError):
+            return {}
+
+    def get(self, underlying: str) -> list[str] | None:
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+            entry = self._entries.get(underlying)
+            codes = entry["codes"] if entry is not None and time.time() - entry["at"] <= self.ttl else None
+            if codes is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return codes
+
+    def _write(self, entries: dict[str, dict]) -> None:
+        self._entries = entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def put(self, underlying: str, codes: list[str]) -> None:
+        with self._lock:
+            entries = self._read()
+            entries[underlying] = {"codes": list(codes), "at": time.time()}
+            self._write(entries)
+
+    def invalidate(self, underlying: str | None = None) -> None:
+        """Forget one underlying, or (with no argument) everything."""
+        with self._lock:
+            entries = self._read() if underlying is not None else {}
+            entries.pop(underlying, None)
+            self._write(entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "ttl_seconds": self.ttl,
+                "path": str(self.path),
+            }
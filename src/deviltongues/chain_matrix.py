@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from deviltongues.schema import OPTION_TYPE, as_datetime, as_option_type, expiry_days, mid_price, years_to_expiry
+
+CALL = OPTION_TYPE.categories.get_loc("Call")
+EMPTY = np.iinfo(np.int32).max
+QUOTE_FIELDS = ("Bid", "Ask", "Last", "mid")
+SIDES = ("Call", "Put")
+
+
+@dataclass(frozen=True, eq=False)
+class ChainMatrix:
+    """
+    An options chain pivoted once onto an expiry x strike grid.
+
+    `call_row[i, j]` and `put_row[i, j]` are the positions, in the frame the
+    matrix was built from, of the call and the put expiring on
+    `expiry_days[i]` at `strikes[j]` (-1 where there is none), so the put of
+    any call is one array lookup instead of a join. `quotes[field][0]` and
+    `quotes[field][1]` are the call and put Bid, Ask, Last and mid laid out
+    on the same grid (float32, NaN where empty), and `index` maps each RIC
+    to its frame position, so `locate()` and `quotes_at()` are dictionary
+    and array lookups. A second contract of the same type in an occupied
+    cell (an adjusted series, say) is listed in `extra_rows` and still
+    paired by `pairs()`.
+
+    Built with `quotes=False` the matrix keeps only the position grids
+    (`quotes` and `index` are empty): parity pairing needs nothing else, and
+    the eight price grids and the RIC dictionary would be most of the
+    memory of a scan. `grid()` lays out any other column on demand.
+    """
+    expiry_days: np.ndarray  # int32 day numbers (see schema.expiry_dates), sorted, shape (E,)
+    strikes: np.ndarray  # float32, sorted, shape (K,)
+    call_row: np.ndarray  # int32, shape (E, K)
+    put_row: np.ndarray  # int32, shape (E, K)
+    cells: np.ndarray  # int32 flat cell (row * K + col) of every contract in the frame, -1 without an expiry
+    is_call: np.ndarray  # bool per contract
+    extra_rows: np.ndarray  # int32 positions of the contracts not in call_row/put_row
+    rics: pd.Series  # the frame's own RIC column, not a copy
+    quotes: dict[str, np.ndarray]  # field -> float32 (2, E, K), calls then puts; empty when built with quotes=False
+    index: dict[str, int]  # RIC -> frame position; empty when built with quotes=False
+
+    @classmethod
+    def from_chain(cls, chain: pd.DataFrame, quotes: bool = True) -> ChainMatrix:
+        """
+        Build from a merged chain (RIC, CallPutOption, StrikePrice, ExpiryDate,
+        Bid, Ask, Last) as fetch_option_chain returns it; a missing price
+        column is all NaN. Contracts without an expiry are left off the grid,
+        as build_surface_df drops them.
+        """
+        expiry = as_datetime(chain["ExpiryDate"])
+        values = {}
+        if quotes:
+            values = {
+                c: pd.to_numeric(chain[c], errors="coerce").to_numpy(np.float32) if c in chain
+                else np.full(len(chain), np.nan, dtype=np.float32)
+                for c in ("Bid", "Ask", "Last")
+            }
+            values["mid"] = mid_price(values["Bid"], values["Ask"], values["Last"])
+        return cls._build(
+            chain["RIC"],
+            chain["CallPutOption"],
+            expiry_days(expiry),
+            pd.to_numeric(chain["StrikePrice"], errors="coerce").to_numpy(np.float32),
+            expiry.notna().to_numpy(),
+            values,
+            quotes,
+        )
+
+    @classmethod
+    def from_surface(cls, surface_df: pd.DataFrame, quotes: bool = False) -> ChainMatrix:
+        """
+        Build from a `build_surface_df` frame (RIC, CallPutOption, K, ExpiryDay,
+        mid, ...). That frame has no bid, ask or last, so with `quotes=True`
+        only the mid grids are filled.
+        """
+        return cls._build(
+            surface_df["RIC"],
+            surface_df["CallPutOption"],
+            surface_df["ExpiryDay"].to_numpy(np.int32),
+            surface_df["K"].to_numpy(np.float32),
+            np.ones(len(surface_df), dtype=bool),
+            {"mid": surface_df["mid"].to_numpy(np.float32)} if quotes else {},
+            quotes,
+        )
+
+    @classmethod
+    def _build(cls, rics, option_type, days, strike, valid, values, indexed) -> ChainMatrix:
+        codes = as_option_type(option_type).cat.codes.to_numpy()
+        unknown = np.flatnonzero(codes < 0)
+        if len(unknown):
+            sample = pd.Series(option_type).iloc[unknown[:3]].tolist()
+            raise ValueError(f"{len(unknown)} contracts are neither Call nor Put, e.g. {sample}")
+
+        # sorted uniques and binary searches rather than np.unique(return_inverse=True),
+        # whose int64 sort order and inverse would be the largest temporaries of a scan
+        expiries = np.unique(days[valid])
+        strikes = np.unique(strike[valid])
+        cells = np.searchsorted(expiries, days).astype(np.int32)
+        cells *= len(strikes)
+        np.add(cells, np.searchsorted(strikes, strike), out=cells, casting="unsafe")
+        cells[~valid] = -1
+        is_call = codes == CALL
+
+        grids, extras = [], []
+        for side in (is_call, ~is_call):
+            rows = np.flatnonzero(side & valid).astype(np.int32)
+            # the first contract in each cell goes on the grid, any later one is an extra
+            grid = np.full(len(expiries) * len(strikes), EMPTY, dtype=np.int32)
+            np.minimum.at(grid, cells[rows], rows)
+            extras.append(rows[grid[cells[rows]] != rows])
+            grid[grid == EMPTY] = -1
+            grids.append(grid.reshape(len(expiries), len(strikes)))
+
+        quotes = {}
+        for field, column in values.items():
+            laid_out = np.full((2, *grids[0].shape), np.nan, dtype=np.float32)
+            for side, rows in enumerate(grids):
+                occupied = rows >= 0
+                laid_out[side][occupied] = column[rows[occupied]]
+            quotes[field] = laid_out
+        index = {}
+        if indexed:
+            # reversed so that a RIC listed twice maps to its first row
+            index = dict(zip(reversed(rics.tolist()), range(len(rics) - 1, -1, -1)))
+
+        return cls(
+            expiry_days=expiries.astype(np.int32),
+            strikes=strikes.astype(np.float32),
+            call_row=grids[0],
+            put_row=grids[1],
+            cells=cells,
+            is_call=is_call,
+            extra_rows=np.sort(np.concatenate(extras)).astype(np.int32),
+            rics=rics,
+            quotes=quotes,
+            index=index,
+        )
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.expiry_days), len(self.strikes)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the grids, the per-contract arrays and the RIC index
+        (its table and int keys; the RIC strings are the frame's).
+        """
+        arrays = (self.expiry_days, self.strikes, self.call_row, self.put_row, self.cells, self.is_call, self.extra_rows)
+        index = sys.getsizeof(self.index) + sum(sys.getsizeof(v) for v in self.index.values()) if self.index else 0
+        return sum(a.nbytes for a in arrays) + sum(q.nbytes for q in self.quotes.values()) + index
+
+    def pairs(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (call_row, put_row) frame positions of every call/put pair sharing an
+        expiry and strike, in the order an inner merge of the calls with the
+        puts returns them: by call position, then put position.
+        """
+        calls = np.flatnonzero(self.is_call & (self.cells >= 0)).astype(np.int32)
+        put_row = self.put_row.ravel()[self.cells[calls]]
+        found = put_row >= 0
+        call_row, put_row = calls[found], put_row[found]
+
+        extra_puts = self.extra_rows[~self.is_call[self.extra_rows]]
+        if len(extra_puts) == 0:
+            return call_row, put_row
+
+        # cells holding more than one put: pair every call there with every put there
+        crowded = np.zeros(self.call_row.size, dtype=bool)
+        crowded[self.cells[extra_puts]] = True
+        keep = ~crowded[self.cells[call_row]]
+        puts = np.flatnonzero(~self.is_call & (self.cells >= 0)).astype(np.int32)
+        calls = calls[crowded[self.cells[calls]]]
+        puts = puts[crowded[self.cells[puts]]]
+        left, right = _join_rows(self.cells[calls], self.cells[puts])
+
+        # both lists are in call order and share no call, so the crowded pairs slot in by binary search
+        call_row, put_row = call_row[keep], put_row[keep]
+        at = np.searchsorted(call_row, calls[left])
+        return np.insert(call_row, at, calls[left]), np.insert(put_row, at, puts[right])
+
+    def cell(self, expiry, strike: float) -> tuple[int, int]:
+        """Grid position of an (expiry, strike), raising KeyError if either is not in the chain."""
+        day = expiry if isinstance(expiry, (int, np.integer)) else expiry_days(pd.Series([pd.Timestamp(expiry)]))[0]
+        strike = np.float32(strike)
+        row = int(np.searchsorted(self.expiry_days, day))
+        col = int(np.searchsorted(self.strikes, strike))
+        if row >= len(self.expiry_days) or self.expiry_days[row] != day:
+            raise KeyError(f"expiry {expiry} not in chain")
+        if col >= len(self.strikes) or self.strikes[col] != strike:
+            raise KeyError(f"strike {strike} not in chain")
+        return row, col
+
+    def pair(self, expiry, strike: float) -> tuple[int, int]:
+        """(call, put) frame positions at an (expiry, strike), -1 for a missing leg."""
+        row, col = self.cell(expiry, strike)
+        return int(self.call_row[row, col]), int(self.put_row[row, col])
+
+    def locate(self, ric: str) -> tuple[str, int, int]:
+        """
+        ("Call" | "Put", row, col) of a RIC, raising KeyError if it is not on
+        the grid. A dictionary lookup, or a scan of the RIC column for a
+        matrix built without quotes.
+        """
+        if self.index:
+            position = self.index.get(ric, -1)
+        else:
+            found = np.flatnonzero((self.rics == ric).to_numpy(dtype=bool, na_value=False))
+            position = found[0] if len(found) else -1
+        if position < 0 or self.cells[position] < 0:
+            raise KeyError(ric)
+        row, col = divmod(int(self.cells[position]), len(self.strikes))
+        return ("Call" if self.is_call[position] else "Put"), row, col
+
+    def quote(self, field: str, side: str = "Call") -> np.ndarray:
+        """The stored (E, K) grid of `field` (Bid, Ask, Last or mid) for one side."""
+        if field not in self.quotes:
+            raise KeyError(f"{field} is not stored; build the matrix with quotes=True")
+        return self.quotes[field][SIDES.index(side)]
+
+    def quotes_at(self, expiry, strike: float) -> dict[str, tuple[float, float]]:
+        """{field: (call, put)} of the stored quotes at an (expiry, strike), NaN for a missing leg."""
+        row, col = self.cell(expiry, strike)
+        return {field: (float(grid[0, row, col]), float(grid[1, row, col])) for field, grid in self.quotes.items()}
+
+    def grid(self, values, side: str = "Call") -> np.ndarray:
+        """A per-contract column of the frame (e.g. mid, Bid) as a float32 expiry x strike grid, NaN where empty."""
+        rows = self.call_row if side == "Call" else self.put_row
+        values = np.asarray(values, dtype=np.float32)
+        if len(values) != len(self.cells):
+            raise ValueError(f"{len(values)} values for {len(self.cells)} contracts")
+        out = np.full(rows.shape, np.nan, dtype=np.float32)
+        occupied = rows >= 0
+        out[occupied] = values[rows[occupied]]
+        return out
+
+    def years_to_expiry(self, now: pd.Timestamp | None = None) -> np.ndarray:
+        """Year fraction per expiry row, computed the same way as build_surface_df."""
+        return years_to_expiry(self.expiry_days, pd.Timestamp.now() if now is None else now)
+
+
+def _join_rows(left: np.ndarray, right: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Positions of every (left, right) pair with equal keys, in the order an
+    inner `merge` returns them: by left position, then right position.
+    """
+    order = np.argsort(right, kind="stable").astype(np.int32)
+    ordered = right[order]
+    lo = np.searchsorted(ordered, left, side="left").astype(np.int32)
+    counts = np.searchsorted(ordered, left, side="right").astype(np.int32) - lo
+    del ordered
+    left_rows = np.repeat(np.arange(len(left), dtype=np.int32), counts)
+    within = np.arange(len(left_rows), dtype=np.int32) - np.repeat(np.cumsum(counts, dtype=np.int32) - counts, counts)
+    return left_rows, order[np.repeat(lo, counts) + within]
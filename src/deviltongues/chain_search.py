@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+
+import pandas as pd
+import refinitiv.data as rd
+
+from deviltongues.metrics import metrics
+from deviltongues.providers import get_provider
+
+SEARCH_CAP = 1000  # most rows discovery.search will return for one query
+CHAIN_FIELDS = ["RIC", "CallPutOption", "StrikePrice", "ExpiryDate"]
+
+
+def _fmt_number(x: float) -> str:
+    return format(float(x), "f").rstrip("0").rstrip(".")
+
+
+@dataclass(frozen=True)
+class ChainQuery:
+    """
+    One discovery.search window over an options chain. Expiry bounds are
+    exclusive and strike bounds inclusive, as in the original app filter.
+    """
+    underlying: str
+    min_strike: float
+    max_strike: float
+    min_expiry: date
+    max_expiry: date
+    exchange: str = "OPRA"
+
+    def filter(self) -> str:
+        return (
+            "( SearchAllCategoryv2 eq 'Options' and "
+            f"(ExpiryDate gt {self.min_expiry} and ExpiryDate lt {self.max_expiry}) and "
+            f"(StrikePrice ge {_fmt_number(self.min_strike)} and StrikePrice le {_fmt_number(self.max_strike)}) and "
+            f"ExchangeName xeq '{self.exchange}' and "
+            f"(UnderlyingQuoteRIC eq '{self.underlying}'))"
+        )
+
+    def _with_expiry(self, lo: date, hi: date) -> ChainQuery | None:
+        # an exclusive (lo, hi) window needs hi - lo >= 2 to contain a day
+        return replace(self, min_expiry=lo, max_expiry=hi) if (hi - lo).days >= 2 else None
+
+    def _expiry_parts(self, cuts: list[date]) -> list[ChainQuery | None]:
+        # each window ends on (includes) its cut day and the next one starts the day after
+        one_day = timedelta(days=1)
+        lows = [self.min_expiry] + cuts
+        highs = [c + one_day for c in cuts] + [self.max_expiry]
+        return [self._with_expiry(lo, hi) for lo, hi in zip(lows, highs)]
+
+    def split(
+            self,
+            observed: pd.DataFrame | None = None,
+            fanout: int = 4,
+            min_strike_width: float = 0.01) -> tuple[ChainQuery, ...]:
+        """
+        Partition the window into up to `fanout` smaller windows that together
+        cover it.
+
+        `observed` is the capped result of searching this window, used to cut
+        between expiries that actually exist rather than at calendar points.
+        Expiry is split first; a single-expiry window is split by strike.
+        Returns an empty tuple once the window cannot be split any further.
+        """
+        one_day = timedelta(days=1)
+        days = []
+        if observed is not None and not observed.empty:
+            days = sorted(set(pd.to_datetime(observed["ExpiryDate"]).dt.date))
+            days = [d for d in days if self.min_expiry < d < self.max_expiry]
+
+        if len(days) >= 2:
+            n = min(fanout, len(days))
+            parts = self._expiry_parts(sorted({days[len(days) * i // n - 1] for i in range(1, n)}))
+        elif len(days) == 1:
+            # the one expiry seen is what filled the page, so isolate it and
+            # split it by strike straight away
+            d = days[0]
+            before, day, after = self._expiry_parts([d - one_day, d])
+            parts = [before, after, *(day._split_strikes(fanout, min_strike_width) or (day,))]
+        else:
+            span = (self.max_expiry - self.min_expiry).days
+            n = max(2, min(fanout, span - 1))
+            parts = self._expiry_parts(sorted({self.min_expiry + timedelta(days=span * i // n) for i in range(1, n)}))
+
+        parts = tuple(p for p in parts if p is not None)
+        if len(parts) > 1:
+            return parts
+
+        return self._split_strikes(fanout, min_strike_width)
+
+    def _split_strikes(self, fanout: int, min_strike_width: float) -> tuple[ChainQuery, ...]:
+        width = self.max_strike - self.min_strike
+        if width <= min_strike_width:
+            return ()
+        # strike bounds are inclusive, so neighbours share their edge; scan_chain de-duplicates
+        edges = [self.min_strike + width * i / fanout for i in range(fanout)] + [self.max_strike]
+        return tuple(replace(self, min_strike=lo, max_strike=hi) for lo, hi in zip(edges[:-1], edges[1:]))
+
+
+@dataclass
+class ChainScanResult:
+    chain: pd.DataFrame
+    queries: int = 0
+    truncated: list[ChainQuery] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def search_chain(query: ChainQuery, top: int = SEARCH_CAP, search=None) -> pd.DataFrame:
+    search = get_provider().search if search is None else search
+    with metrics.time("discovery.search", query.underlying):
+        return search(
+            view=rd.discovery.Views.EQUITY_QUOTES,
+            top=top,
+            filter=query.filter(),
+            select=",".join(CHAIN_FIELDS),
+        )
+
+
+def scan_chain(
+        query: ChainQuery,
+        top: int | None = SEARCH_CAP,
+        search=None,
+        max_workers: int = 8) -> ChainScanResult:
+    """
+    Fetch a whole chain even when it is larger than one search can return.
+
+    Any window that comes back with `top` rows is assumed truncated, split
+    (see ChainQuery.split) and the parts are searched concurrently, until
+    every window is under the cap. Results are de-duplicated by RIC. Windows
+    that are still at the cap but cannot be split further are listed in
+    `truncated`. `top` is the page size of each search, not a limit on the
+    result: a smaller one only means more searches. None is SEARCH_CAP.
+    """
+    top = SEARCH_CAP if top is None else max(1, min(int(top), SEARCH_CAP))
+    start = time.perf_counter()
+
+    frames = []
+    truncated = []
+    queries = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(search_chain, query, top, search): query}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                q = pending.pop(future)
+                queries += 1
+                df = future.result()
+
+                if len(df) >= top:
+                    parts = q.split(observed=df)
+                    if parts:
+                        for part in parts:
+                            pending[pool.submit(search_chain, part, top, search)] = part
+                        continue
+                    truncated.append(q)
+
+                frames.append(df)
+
+    frames = [df for df in frames if not df.empty]
+    if frames:
+        chain = (
+            pd.concat(frames, ignore_index=True)
+            .drop_duplicates(subset="RIC")
+            .sort_values(["ExpiryDate", "StrikePrice", "CallPutOption"], kind="stable")
+            .reset_index(drop=True)
+        )
+    else:
+        chain = pd.DataFrame(columns=CHAIN_FIELDS)
+
+    return ChainScanResult(
+        chain=chain,
+        queries=queries,
+        truncated=truncated,
+        elapsed=time.perf_counter() - start,
+    )
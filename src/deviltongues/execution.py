@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+REVERSE_CONVERSION = "Sell Call+Buy Put+Buy Stock"
+CONVERSION = "Buy Call+Sell Put+Short Stock"
+
+CONTRACT_MULTIPLIER = 100
+
+
+def get_strategy_summary(signal: str) -> str:
+    if "Sell synthetic" in signal:
+        return REVERSE_CONVERSION
+    elif "Buy synthetic" in signal:
+        return CONVERSION
+    return signal
+
+
+def _execution_cost_arrays(K, S, C, P, T, r_diff, reverse, contracts, commission, slippage_pct, risk_free_rate) -> dict:
+    """
+    Cost model shared by the scalar and batch entry points. Every leg is
+    computed for both branches and the row's own branch is picked with
+    np.where, so one row and ten thousand rows go through identical arithmetic.
+    """
+    call_value = C * contracts * CONTRACT_MULTIPLIER
+    put_value = P * contracts * CONTRACT_MULTIPLIER
+    stock_value = S * contracts * CONTRACT_MULTIPLIER
+    strike_value = K * contracts * CONTRACT_MULTIPLIER
+    days_to_expiry = T * 365
+
+    total_commission = commission * 3
+    total_notional = call_value + put_value + stock_value
+    slippage_cost = total_notional * (slippage_pct / 100)
+    total_costs = total_commission + slippage_cost
+    growth = np.exp(risk_free_rate * T)
+
+    # reverse conversion: sell call, buy put, buy stock, receive K at expiry
+    reverse_option_net = call_value - put_value
+    initial_outflow = stock_value - reverse_option_net + total_costs
+    reverse_net_pnl = strike_value - initial_outflow * growth
+
+    # conversion: buy call, sell put, short stock, pay K at expiry
+    conversion_option_net = put_value - call_value
+    initial_inflow = stock_value + conversion_option_net - total_costs
+    conversion_net_pnl = initial_inflow * growth - strike_value
+
+    theoretical_profit = np.where(reverse, r_diff * strike_value * T, np.abs(r_diff) * strike_value * T)
+    required_margin = np.where(reverse, stock_value * 0.5, stock_value * 1.5)
+    capital_employed = np.where(reverse, initial_outflow, required_margin)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(capital_employed > 0, theoretical_profit / capital_employed * 100, 0.0)
+        annualized_return = np.where(days_to_expiry > 0, roi * 365 / days_to_expiry, 0.0)
+
+    return {
+        'call_value': call_value,
+        'put_value': put_value,
+        'stock_value': stock_value,
+        'strike_value': strike_value,
+        'option_net': np.where(reverse, reverse_option_net, conversion_option_net),
+        'initial_cash': np.where(reverse, -initial_outflow, initial_inflow),
+        'expiry_cash': np.where(reverse, strike_value, -strike_value),
+        'total_commission': np.broadcast_to(total_commission, np.shape(K)),
+        'slippage_cost': slippage_cost,
+        'total_costs': total_costs,
+        'net_pnl': np.where(reverse, reverse_net_pnl, conversion_net_pnl),
+        'theoretical_profit': theoretical_profit,
+        'required_margin': required_margin,
+        'capital_employed': capital_employed,
+        'roi': roi,
+        'annualized_return': annualized_return,
+        'best_case': theoretical_profit * 1.3,
+        'worst_case': theoretical_profit * 0.7,
+        'days_to_expiry': days_to_expiry,
+    }
+
+
+def calculate_execution_costs(row, contracts, commission, slippage_pct, risk_free_rate):
+    strategy_type = get_strategy_summary(row['signal'])
+
+    costs = _execution_cost_arrays(
+        K=np.array([row['K']], dtype=np.float64),
+        S=np.array([row['S']], dtype=np.float64),
+        C=np.array([row['C_mid']], dtype=np.float64),
+        P=np.array([row['P_mid']], dtype=np.float64),
+        T=np.array([row['T']], dtype=np.float64),
+        r_diff=np.array([row['r_diff']], dtype=np.float64),
+        reverse=np.array([strategy_type == REVERSE_CONVERSION]),
+        contracts=contracts,
+        commission=commission,
+        slippage_pct=slippage_pct,
+        risk_free_rate=risk_free_rate,
+    )
+    costs = {name: values[0] for name, values in costs.items()}
+
+    return {
+        'strategy_type': strategy_type,
+        'strike': row['K'],
+        'spot': row['S'],
+        'call_mid': row['C_mid'],
+        'put_mid': row['P_mid'],
+        **costs,
+        'implied_rate': row['implied_r'],
+        'rate_diff': row['r_diff'],
+        'risk_free_rate': risk_free_rate
+    }
+
+
+def execution_costs_batch(arb_df: pd.DataFrame, contracts, commission, slippage_pct, risk_free_rate) -> pd.DataFrame:
+    """
+    Cost every row of an arbitrage frame (as returned by analyze_arbitrage) at
+    once. The result is indexed like `arb_df` and has one column per numeric
+    key of `calculate_execution_costs`, plus strategy_type, and agrees with it
+    exactly row by row.
+    """
+    signal = arb_df["signal"].astype(str)
+    strategy_type = signal.map({s: get_strategy_summary(s) for s in signal.unique()})
+
+    costs = _execution_cost_arrays(
+        K=arb_df["K"].to_numpy(np.float64),
+        S=arb_df["S"].to_numpy(np.float64),
+        C=arb_df["C_mid"].to_numpy(np.float64),
+        P=arb_df["P_mid"].to_numpy(np.float64),
+        T=arb_df["T"].to_numpy(np.float64),
+        r_diff=arb_df["r_diff"].to_numpy(np.float64),
+        reverse=(strategy_type == REVERSE_CONVERSION).to_numpy(),
+        contracts=contracts,
+        commission=commission,
+        slippage_pct=slippage_pct,
+        risk_free_rate=risk_free_rate,
+    )
+
+    out = pd.DataFrame(costs, index=arb_df.index)
+    out.insert(0, "strategy_type", strategy_type)
+    return out
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from deviltongues.chain_cache import _safe_name
+
+DEFAULT_HISTORY_DIR = Path(
+    os.environ.get("DEVILTONGUES_HISTORY_DIR", Path.home() / ".local" / "share" / "deviltongues" / "history")
+)
+
+HISTORY_SCHEMA = pa.schema([
+    ("fetched_at", pa.timestamp("us")),
+    ("spot", pa.float64()),
+    ("RIC", pa.string()),
+    ("CallPutOption", pa.string()),
+    ("StrikePrice", pa.float64()),
+    ("ExpiryDate", pa.timestamp("us")),
+    ("Bid", pa.float64()),
+    ("Ask", pa.float64()),
+    ("Last", pa.float64()),
+])
+REPLACES = ".replaces"  # suffix of a compaction's list of the files it merged
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("underlying", pa.string()), ("date", pa.date32())]),
+    flavor="hive",
+)
+
+
+class HistoryStore:
+    """
+    Append-only Parquet history of fetched chains, partitioned as
+    `root/underlying=<RIC>/date=<YYYY-MM-DD>/<time>-<id>.parquet`.
+
+    Every `append` writes one new file holding one snapshot (quotes, spot and
+    fetch time), sorted by expiry and strike so row-group statistics let
+    `read` skip whatever falls outside the requested expiry and strike range.
+    Reads list only the underlying and date directories they ask for, so a
+    day of one name costs the same however much else is stored. `compact`
+    merges a finished day's files into one to keep the file count down;
+    until it has deleted the originals, readers skip them, so no row is ever
+    seen twice.
+    """
+
+    def __init__(self, root: str | Path | None = None, row_group_size: int = 64_000):
+        self.root = Path(root) if root is not None else DEFAULT_HISTORY_DIR
+        self.row_group_size = row_group_size
+        self._lock = threading.Lock()
+        self.appends = 0
+
+    def partition_dir(self, underlying: str, day: date) -> Path:
+        return self.root / f"underlying={_safe_name(underlying)}" / f"date={day.isoformat()}"
+
+    def _to_table(self, chain: pd.DataFrame, spot: float, fetched_at: datetime) -> pa.Table:
+        df = pd.DataFrame({
+            "fetched_at": pd.Timestamp(fetched_at),
+            "spot": float(spot),
+            "RIC": chain["RIC"].astype(str),
+            "CallPutOption": chain["CallPutOption"].astype(str),
+            "StrikePrice": pd.to_numeric(chain["StrikePrice"], errors="coerce"),
+            "ExpiryDate": pd.to_datetime(chain["ExpiryDate"]),
+            **{c: pd.to_numeric(chain[c], errors="coerce") if c in chain else float("nan") for c in ("Bid", "Ask", "Last")},
+        })
+        df = df.sort_values(["ExpiryDate", "StrikePrice", "CallPutOption"], kind="stable")
+        return pa.Table.from_pandas(df, schema=HISTORY_SCHEMA, preserve_index=False)
+
+    def _write(self, table: pa.Table, directory: Path, name: str) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(table, tmp, row_group_size=self.row_group_size)
+            path = directory / name
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return path
+
+    def append(self, underlying: str, chain: pd.DataFrame, spot: float, fetched_at: datetime | None = None) -> Path | None:
+        """Write one snapshot of `chain` as a new file; returns its path, or None for an empty chain."""
+        if chain is None or chain.empty:
+            return None
+        fetched_at = datetime.now() if fetched_at is None else fetched_at
+        table = self._to_table(chain, spot, fetched_at)
+        name = f"{fetched_at:%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+        path = self._write(table, self.partition_dir(underlying, fetched_at.date()), name)
+        with self._lock:
+            self.appends += 1
+        return path
+
+    def append_snapshot(self, snapshot) -> Path | None:
+        """SnapshotStore listener: record every published refresh snapshot."""
+        return self.append(snapshot.query.underlying, snapshot.chain, snapshot.spot, snapshot.fetched_at)
+
+    def files(self, underlying: str | None = None, first: date | None = None, last: date | None = None) -> list[Path]:
+        """
+        Snapshot files of `underlying` (default: every name) dated `first` to
+        `last` inclusive. Only the matching underlying and date directories
+        are listed, so the cost does not grow with the rest of the history.
+        """
+        if underlying is not None:
+            names = [self.root / f"underlying={_safe_name(underlying)}"]
+        else:
+            names = sorted(self.root.glob("underlying=*"))
+        files = []
+        for u_dir in names:
+            for d_dir in sorted(u_dir.glob("date=*")):
+                day = date.fromisoformat(d_dir.name.split("=", 1)[1])
+                if (first is None or day >= first) and (last is None or day <= last):
+                    files.extend(self._live_files(d_dir))
+        return files
+
+    @staticmethod
+    def _live_files(directory: Path) -> list[Path]:
+        """
+        The Parquet files of one partition, less those a compaction has
+        already merged into its file but not yet deleted.
+        """
+        replaced = set()
+        for manifest in directory.glob("*.parquet" + REPLACES):
+            if manifest.with_suffix("").exists():
+                try:
+                    replaced.update(manifest.read_text().split())
+                except FileNotFoundError:  # the compaction finished meanwhile
+                    pass
+        return [f for f in sorted(directory.glob("*.parquet")) if f.name not in replaced]
+
+    def dataset(self, underlying: str | None = None, first: date | None = None, last: date | None = None) -> ds.Dataset:
+        """The files of `files()` as one dataset, with `underlying` and `date` columns from their directories."""
+        return ds.dataset(
+            [str(f) for f in self.files(underlying, first, last)],
+            schema=pa.unify_schemas([HISTORY_SCHEMA, PARTITIONING.schema]),
+            format="parquet",
+            partitioning=PARTITIONING,
+            partition_base_dir=str(self.root),
+            exclude_invalid_files=False,
+        )
+
+    def read(
+            self,
+            underlying: str | None = None,
+            start: datetime | None = None,
+            end: datetime | None = None,
+            min_expiry=None,
+            max_expiry=None,
+            min_strike: float | None = None,
+            max_strike: float | None = None,
+            columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Snapshots with `start <= fetched_at < end`, expiries and strikes within
+        the inclusive bounds given. All bounds are optional; the underlying and
+        the dates of `start`/`end` pick the partition directories that are
+        listed at all, the rest is pushed down to the Parquet reader.
+        """
+        if not self.root.exists():
+            return HISTORY_SCHEMA.empty_table().to_pandas()
+
+        conditions = []
+        if start is not None:
+            start = pd.Timestamp(start)
+            conditions.append(ds.field("fetched_at") >= pa.scalar(start.to_pydatetime(), pa.timestamp("us")))
+        if end is not None:
+            end = pd.Timestamp(end)
+            conditions.append(ds.field("fetched_at") < pa.scalar(end.to_pydatetime(), pa.timestamp("us")))
+        if min_expiry is not None:
+            conditions.append(ds.field("ExpiryDate") >= pa.scalar(pd.Timestamp(min_expiry).to_pydatetime(), pa.timestamp("us")))
+        if max_expiry is not None:
+            conditions.append(ds.field("ExpiryDate") <= pa.scalar(pd.Timestamp(max_expiry).to_pydatetime(), pa.timestamp("us")))
+        if min_strike is not None:
+            conditions.append(ds.field("StrikePrice") >= float(min_strike))
+        if max_strike is not None:
+            conditions.append(ds.field("StrikePrice") <= float(max_strike))
+
+        expression = None
+        for c in conditions:
+            expression = c if expression is None else expression & c
+
+        dataset = self.dataset(
+            underlying,
+            start.date() if start is not None else None,
+            end.date() if end is not None else None,
+        )
+        table = dataset.to_table(columns=columns, filter=expression)
+        if columns is None or "fetched_at" in columns:
+            table = table.sort_by([("fetched_at", "ascending")])
+        return table.to_pandas()
+
+    def partitions(self, underlying: str | None = None) -> list[tuple[str, date]]:
+        """(underlying, date) pairs that have at least one snapshot, in sorted order."""
+        pairs = []
+        dirs = [self.root / f"underlying={_safe_name(underlying)}"] if underlying is not None else sorted(self.root.glob("underlying=*"))
+        for u_dir in dirs:
+            for d_dir in sorted(u_dir.glob("date=*")):
+                if any(d_dir.glob("*.parquet")):
+                    pairs.append((u_dir.name.split("=", 1)[1], date.fromisoformat(d_dir.name.split("=", 1)[1])))
+        return pairs
+
+    def snapshot_times(self, underlying: str, day: date) -> list[pd.Timestamp]:
+        """Distinct fetch times recorded for one name on one day."""
+        directory = self.partition_dir(underlying, day)
+        if not directory.exists():
+            return []
+        files = [str(f) for f in self._live_files(directory)]
+        table = ds.dataset(files, schema=HISTORY_SCHEMA, format="parquet").to_table(columns=["fetched_at"])
+        return sorted(pd.to_datetime(pc.unique(table["fetched_at"]).to_pandas()))
+
+    def compact(self, underlying: str, day: date) -> Path | None:
+        """
+        Merge one partition's files into a single file sorted by fetch time,
+        expiry and strike.
+
+        The names of the merged files are written next to the new file
+        (`<name>.parquet.replaces`) before it appears under its own name, so
+        from that moment readers skip the originals. Only then are they
+        deleted, and the list last. A compaction cut short is finished by
+        the next one: its originals are deleted if its file made it, its
+        list otherwise.
+        """
+        directory = self.partition_dir(underlying, day)
+        self._finish_compactions(directory)
+        files = self._live_files(directory)
+        if len(files) < 2:
+            return files[0] if files else None
+
+        table = pa.concat_tables([pq.read_table(f, schema=HISTORY_SCHEMA) for f in files])
+        table = table.sort_by([("fetched_at", "ascending"), ("ExpiryDate", "ascending"), ("StrikePrice", "ascending")])
+        name = f"compacted-{uuid.uuid4().hex[:8]}.parquet"
+        manifest = directory / (name + REPLACES)
+        manifest.write_text("\n".join(f.name for f in files) + "\n")
+        try:
+            path = self._write(table, directory, name)
+        except BaseException:
+            manifest.unlink(missing_ok=True)
+            raise
+        for f in files:
+            f.unlink(missing_ok=True)
+        manifest.unlink()
+        return path
+
+    @staticmethod
+    def _finish_compactions(directory: Path) -> None:
+        for manifest in directory.glob("*.parquet" + REPLACES):
+            if manifest.with_suffix("").exists():
+                for name in manifest.read_text().split():
+                    (directory / name).unlink(missing_ok=True)
+            manifest.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        files = list(self.root.glob("underlying=*/date=*/*.parquet")) if self.root.exists() else []
+        return {
+            "appends": self.appends,
+            "files": len(files),
+            "bytes": sum(f.stat().st_size for f in files),
+            "partitions": len({f.parent for f in files}),
+        }
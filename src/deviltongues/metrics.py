@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class _Series:
+    __slots__ = ("samples", "count", "total", "last")
+
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+
+class LatencyMetrics:
+    """
+    Per-(stage, underlying) latency, kept as a rolling window of the last
+    `window` samples for quantiles plus running count and sum.
+
+    `observe()` is a lock, a deque append and two additions, so timing every
+    stage of every request costs microseconds; quantiles are only computed
+    when someone reads them. With `enabled=False` (or DEVILTONGUES_METRICS=0)
+    `time()` does nothing.
+    """
+
+    def __init__(self, window: int = 1024, enabled: bool | None = None):
+        self.window = window
+        self.enabled = os.environ.get("DEVILTONGUES_METRICS", "1") != "0" if enabled is None else enabled
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float, underlying: str = "") -> None:
+        key = (stage, underlying)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(self.window)
+            series.samples.append(seconds)
+            series.count += 1
+            series.total += seconds
+            series.last = seconds
+
+    @contextmanager
+    def time(self, stage: str, underlying: str = ""):
+        """Time the block as one sample of `stage`, also when it raises."""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0, underlying)
+
+    def timed(self, stage: str, fn, underlying: str = ""):
+        """Wrap `fn` so every call is timed as `stage`."""
+        def wrapper(*args, **kwargs):
+            with self.time(stage, underlying):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def _copy(self):
+        with self._lock:
+            return [
+                (stage, underlying, np.fromiter(s.samples, float, len(s.samples)), s.count, s.total, s.last)
+                for (stage, underlying), s in self._series.items()
+            ]
+
+    def summary(self) -> pd.DataFrame:
+        """One row per (stage, underlying): count, mean, last and rolling p50/p95/p99 in milliseconds."""
+        rows = []
+        for stage, underlying, samples, count, total, last in self._copy():
+            p50, p95, p99 = np.quantile(samples, QUANTILES) if samples.size else (np.nan,) * 3
+            rows.append({
+                "stage": stage,
+                "underlying": underlying,
+                "count": count,
+                "mean_ms": total / count * 1000 if count else np.nan,
+                "p50_ms": p50 * 1000,
+                "p95_ms": p95 * 1000,
+                "p99_ms": p99 * 1000,
+                "last_ms": last * 1000,
+            })
+        columns = ["stage", "underlying", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "last_ms"]
+        return pd.DataFrame(rows, columns=columns).sort_values(["stage", "underlying"], ignore_index=True)
+
+    def prometheus_text(self, name: str = "deviltongues_stage_latency_seconds") -> str:
+        """Prometheus text exposition: one summary with rolling quantiles per (stage, underlying)."""
+        lines = [
+            f"# HELP {name} Latency of each pipeline stage; quantiles over the last {self.window} samples.",
+            f"# TYPE {name} summary",
+        ]
+        for stage, underlying, samples, count, total, _ in sorted(self._copy(), key=lambda s: s[:2]):
+            labels = f'stage="{_escape(stage)}",underlying="{_escape(underlying)}"'
+            if samples.size:
+                for q, v in zip(QUANTILES, np.quantile(samples, QUANTILES)):
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {v:.9g}')
+            lines.append(f"{name}_sum{{{labels}}} {total:.9g}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = LatencyMetrics()
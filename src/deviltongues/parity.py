@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from deviltongues.chain_matrix import ChainMatrix
+from deviltongues.schema import expiry_dates
+
+SELL_SYNTHETIC = "Sell synthetic, buy stock"
+BUY_SYNTHETIC = "Buy synthetic, short stock"
+
+# indexed by side + 1, so -1 -> buy synthetic, 0 -> no signal, 1 -> sell synthetic
+SIGNAL_LABELS = np.array([BUY_SYNTHETIC, None, SELL_SYNTHETIC], dtype=object)
+
+
+def implied_rate(S, C, P, K, T) -> np.ndarray:
+    """
+    Implied risk-free rate from put-call parity, C - P = S - K e^(-rT), i.e.
+    r = -(1/T) ln((S - (C - P)) / K).
+
+    Inputs are scalars or arrays that broadcast against each other. The result
+    is NaN wherever T <= 0, K <= 0 or the numerator S - (C - P) is not positive.
+    """
+    # Broadcast views of the inputs (no float64 copies); the arithmetic is
+    # float64 and done in place, so the only full-size temporaries are the
+    # result, the numerator and the mask.
+    S, C, P, K, T = np.broadcast_arrays(*(np.asarray(a) for a in (S, C, P, K, T)))
+
+    numerator = np.array(C, dtype=np.float64)
+    np.subtract(numerator, P, out=numerator)
+    np.subtract(S, numerator, out=numerator)
+    valid = (T > 0) & (K > 0) & (numerator > 0)
+
+    r = np.full(numerator.shape, np.nan)
+    np.divide(numerator, K, out=numerator, where=valid)
+    np.log(numerator, out=r, where=valid)
+    np.divide(r, T, out=r, where=valid)
+    np.negative(r, out=r, where=valid)
+    return r
+
+
+def rate_signals(implied_r, risk_free_rate: float, threshold: float):
+    """
+    Spread of the implied rate over the benchmark and the trade direction.
+
+    Returns (r_diff, side) where side is +1 when r_diff > threshold (sell the
+    synthetic), -1 when r_diff < -threshold (buy the synthetic) and 0 otherwise,
+    including where implied_r is NaN.
+    """
+    r_diff = np.asarray(implied_r, dtype=np.float64) - risk_free_rate
+
+    side = np.zeros(r_diff.shape, dtype=np.int8)
+    side[r_diff > threshold] = 1
+    side[r_diff < -threshold] = -1
+    return r_diff, side
+
+
+def signal_labels(side) -> np.ndarray:
+    """Map the side codes from `rate_signals` to the signal strings used in the app."""
+    return SIGNAL_LABELS[np.asarray(side, dtype=np.intp) + 1]
+
+
+def parity_kernel(S, C, P, K, T, risk_free_rate: float = 0.05, threshold: float = 0.005):
+    """
+    Implied rate, rate difference and signal side for whole arrays of call/put
+    pairs in one pass. Returns (implied_r, r_diff, side).
+    """
+    implied_r = implied_rate(S, C, P, K, T)
+    r_diff, side = rate_signals(implied_r, risk_free_rate, threshold)
+    return implied_r, r_diff, side
+
+
+def pair_calls_puts(surface_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pair the calls and puts of a `build_surface_df` frame on (ExpiryDay, K)
+    into one row per pair: ExpiryDay, K, T, C_mid, P_mid, implied_r and the
+    call_row/put_row positions of both legs in `surface_df` (use them to
+    look up RICs or anything else per leg), with the spot carried over in
+    `attrs["spot"]`. The pairs come from a ChainMatrix, so each call finds
+    its put with one grid lookup, and the per-pair values are gathered from
+    the surface's arrays. Nothing here depends on the benchmark rate or
+    threshold, so the result can be reused across re-analyses.
+    """
+    spot = surface_df.attrs["spot"]
+    call_row, put_row = ChainMatrix.from_surface(surface_df).pairs()
+
+    mid = surface_df["mid"].to_numpy()
+    strike = surface_df["K"].to_numpy(np.float32)[call_row]
+    years = surface_df["T"].to_numpy()[call_row]
+    call_mid, put_mid = mid[call_row], mid[put_row]
+    paired = pd.DataFrame({
+        "ExpiryDay": surface_df["ExpiryDay"].to_numpy()[call_row],
+        "K": strike,
+        "T": years,
+        "C_mid": call_mid,
+        "P_mid": put_mid,
+        "implied_r": implied_rate(spot, call_mid, put_mid, strike, years),
+        "call_row": call_row,
+        "put_row": put_row,
+    }, copy=False)
+    paired.attrs["spot"] = spot
+    return paired
+
+
+def apply_signals(paired: pd.DataFrame, risk_free_rate: float = 0.05, threshold: float = 0.005) -> pd.DataFrame:
+    """
+    Add r_diff and signal to a frame from `pair_calls_puts` and keep only the
+    flagged rows. Those also get the S and ExpiryDate columns the execution
+    and display code read, which the full pair frame leaves out.
+    """
+    r_diff, side = rate_signals(paired["implied_r"].to_numpy(), risk_free_rate, threshold)
+    hit = side != 0
+
+    flagged = paired[hit].copy()
+    flagged["S"] = paired.attrs["spot"]
+    flagged["ExpiryDate"] = expiry_dates(flagged["ExpiryDay"].to_numpy())
+    flagged["r_diff"] = r_diff[hit]
+    flagged["signal"] = signal_labels(side[hit])
+    return flagged
+
+
+def analyze_surface(surface_df: pd.DataFrame, risk_free_rate: float = 0.05, threshold: float = 0.005) -> pd.DataFrame:
+    """Uncached `pair_calls_puts` + `apply_signals` for callers without an AnalysisCache."""
+    return apply_signals(pair_calls_puts(surface_df), risk_free_rate, threshold)
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import refinitiv.data as rd
+
+from deviltongues.resilience import RequestExecutor, request_executor
+from deviltongues.session import SessionManager, session_manager
+
+
+class MarketDataProvider:
+    """
+    Everything the app, scripts and helpers ask of a market-data vendor.
+
+    The three methods take the same arguments as `rd.discovery.search`,
+    `rd.get_data` and `rd.get_history` and return DataFrames, so a bound
+    method can be passed wherever a `search=` or `get_data=` callable is
+    accepted (scan_chain, fetch_quotes, fetch_option_chain, ...).
+    `open()`/`close()` bracket a user of the provider, like a Shiny session.
+    """
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def search(self, **kwargs) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_data(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_history(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class LSEGProvider(MarketDataProvider):
+    """
+    refinitiv.data through the shared SessionManager (request slots and
+    reconnects) and RequestExecutor (timeouts, retries, circuit breaker).
+    """
+
+    def __init__(self, session: SessionManager = session_manager, executor: RequestExecutor = request_executor):
+        self.session = session
+        self.executor = executor
+
+    def open(self) -> None:
+        self.session.acquire()
+
+    def close(self) -> None:
+        self.session.release()
+
+    def search(self, **kwargs) -> pd.DataFrame:
+        return self.executor.call("search", self.session.call, rd.discovery.search, **kwargs)
+
+    def get_data(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        return self.executor.call("get_data", self.session.call, rd.get_data, universe, fields=fields, **kwargs)
+
+    def get_history(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        return self.executor.call("get_history", self.session.call, rd.get_history, universe, fields=fields, **kwargs)
+
+
+class EikonProvider(MarketDataProvider):
+    """
+    The older `eikon` API, for the legacy worker. Only snapshot data is
+    supported; eikon's per-field error table is printed, as the worker did.
+    """
+
+    def __init__(self, app_key: str):
+        import eikon as ek  # optional: only the legacy worker needs it
+
+        self._ek = ek
+        ek.set_app_key(app_key)
+
+    def get_data(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        df, err = self._ek.get_data(universe, fields, **kwargs)
+        if err:
+            print("Eikon get_data errors:", err)
+        return df if df is not None else pd.DataFrame()
+
+
+class LatencyProvider(MarketDataProvider):
+    """
+    A local stand-in that answers `get_data` with made-up quotes after
+    sleeping `latency` seconds (plus up to `jitter` more) per call, like a
+    round trip to the vendor. Used to measure how batching and worker counts
+    hide latency without a session; `peak_concurrency` is the most calls it
+    has seen in flight at once.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+        self.peak_concurrency = 0
+
+    def get_data(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        universe = [universe] if isinstance(universe, str) else list(universe)
+        fields = list(fields or ["CF_BID", "CF_ASK", "CF_LAST"])
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._in_flight)
+            delay = self.latency + self.jitter * self._rng.random()
+            values = self._rng.uniform(0.5, 20.0, size=(len(universe), len(fields))).round(2)
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        return pd.DataFrame({"Instrument": universe, **dict(zip(fields, values.T))})
+
+
+def _request_key(method: str, args: tuple, kwargs: dict) -> tuple[str, str]:
+    """Canonical JSON of a call and its short hash; enums and dates are stringified."""
+    canonical = json.dumps({"method": method, "args": args, "kwargs": kwargs}, sort_keys=True, default=str)
+    return canonical, hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Pass every call through to `inner` and record it under `root`.
+
+    `root/index.jsonl` gets one line per call (method, request, start offset
+    from the start of the recording, elapsed seconds, error) and each
+    response is stored as `root/responses/<seq>.parquet`. The wrapper is
+    transparent: results and exceptions reach the caller as `inner` gave
+    them, and a response that cannot be written is still returned (its line
+    says why, `unsaved`). Safe to use from several threads; lines are
+    written in completion order.
+    """
+
+    def __init__(self, inner: MarketDataProvider, root: str | Path):
+        self.inner = inner
+        self.root = Path(root)
+        (self.root / "responses").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._seq = 0
+        if (self.root / "index.jsonl").exists():
+            with (self.root / "index.jsonl").open() as f:
+                self._seq = sum(1 for _ in f)
+        self._t0 = time.perf_counter()
+
+    def open(self) -> None:
+        self.inner.open()
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def _record(self, method: str, *args, **kwargs) -> pd.DataFrame:
+        request, key = _request_key(method, args, kwargs)
+        started = time.perf_counter()
+        error = failure = None
+        try:
+            result = getattr(self.inner, method)(*args, **kwargs)
+        except Exception as e:
+            result, failure = None, e
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            seq = self._seq
+            self._seq += 1
+        response = unsaved = None
+        if isinstance(result, pd.DataFrame):
+            response = f"responses/{seq:08d}.parquet"
+            try:
+                result.to_parquet(self.root / response)
+            except Exception as e:
+                # the caller still gets its live result; replay treats the call as never recorded
+                response, unsaved = None, f"{type(e).__name__}: {e}"
+                print(f"Could not record {method} #{seq}: {unsaved}")
+
+        line = json.dumps({
+            "seq": seq,
+            "method": method,
+            "key": key,
+            "request": request,
+            "offset": started - self._t0,
+            "elapsed": elapsed,
+            "response": response,
+            "error": error,
+            "unsaved": unsaved,
+        })
+        with self._lock, (self.root / "index.jsonl").open("a") as f:
+            f.write(line + "\n")
+
+        if failure is not None:
+            raise failure  # the live exception itself: recording must not change what callers catch
+        return result
+
+    def search(self, **kwargs) -> pd.DataFrame:
+        return self._record("search", **kwargs)
+
+    def get_data(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        return self._record("get_data", universe, fields=fields, **kwargs)
+
+    def get_history(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        return self._record("get_history", universe, fields=fields, **kwargs)
+
+
+class RecordedError(RuntimeError):
+    """A call that failed while recording, raised again on replay; the recording itself re-raises the original."""
+
+
+class MissingRecording(LookupError):
+    """Replay was asked for a request that was never recorded."""
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serve a RecordingProvider directory back without a session.
+
+    Requests are matched on method and arguments; repeated identical
+    requests get their recorded responses in the order the recorded calls
+    were started (their `offset`, not the completion order of the index),
+    and the last one again once those run out. Each call sleeps its recorded latency divided by
+    `speed` (`speed=None` or 0 returns immediately), so pipeline timings
+    can be profiled deterministically or replayed accelerated. Recorded
+    failures are raised as RecordedError.
+    """
+
+    def __init__(self, root: str | Path, speed: float | None = 1.0):
+        self.root = Path(root)
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._entries: dict[str, deque] = defaultdict(deque)
+        self._last: dict[str, dict] = {}
+        with (self.root / "index.jsonl").open() as f:
+            for line in f:
+                entry = json.loads(line)
+                if not entry.get("unsaved"):
+                    self._entries[entry["key"]].append(entry)
+        for queue in self._entries.values():
+            # the index is in completion order; hand out repeats in the order they were asked
+            ordered = sorted(queue, key=lambda e: e["offset"])
+            queue.clear()
+            queue.extend(ordered)
+        self.calls = 0
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._entries.values())
+
+    def _replay(self, method: str, *args, **kwargs) -> pd.DataFrame:
+        request, key = _request_key(method, args, kwargs)
+        with self._lock:
+            queue = self._entries.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+            self.calls += 1
+        if entry is None:
+            raise MissingRecording(f"No recorded response for {request}")
+
+        if self.speed:
+            time.sleep(entry["elapsed"] / self.speed)
+        if entry["error"] is not None:
+            raise RecordedError(entry["error"])
+        if entry["response"] is None:
+            return None
+        return pd.read_parquet(self.root / entry["response"])
+
+    def search(self, **kwargs) -> pd.DataFrame:
+        return self._replay("search", **kwargs)
+
+    def get_data(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        return self._replay("get_data", universe, fields=fields, **kwargs)
+
+    def get_history(self, universe, fields=None, **kwargs) -> pd.DataFrame:
+        return self._replay("get_history", universe, fields=fields, **kwargs)
+
+
+def provider_from_env(default: MarketDataProvider | None = None) -> MarketDataProvider:
+    """
+    The provider named by DEVILTONGUES_PROVIDER:
+
+        lseg (default)        live, through the shared session
+        record:<dir>          live, recording every call to <dir>
+        replay:<dir>[@speed]  serve <dir> back, e.g. replay:rec@10 or replay:rec@0 (no delay)
+    """
+    spec = os.environ.get("DEVILTONGUES_PROVIDER", "lseg")
+    live = default if default is not None else LSEGProvider()
+    kind, _, target = spec.partition(":")
+    if kind == "lseg":
+        return live
+    if kind == "record":
+        return RecordingProvider(live, target)
+    if kind == "replay":
+        path, _, speed = target.partition("@")
+        return ReplayProvider(path, speed=float(speed) if speed else 1.0)
+    raise ValueError(f"Unknown DEVILTONGUES_PROVIDER {spec!r}")
+
+
+_provider: MarketDataProvider | None = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> MarketDataProvider:
+    """The process-wide provider, created from DEVILTONGUES_PROVIDER on first use."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = provider_from_env()
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    global _provider
+    with _provider_lock:
+        _provider = provider
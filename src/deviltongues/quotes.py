@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from deviltongues.metrics import metrics
+from deviltongues.providers import get_provider
+
+QUOTE_FIELDS = ["CF_BID", "CF_ASK", "CF_LAST"]
+QUOTE_COLUMNS = {"CF_BID": "Bid", "CF_ASK": "Ask", "CF_LAST": "Last"}
+RIC_CANDIDATE_COLUMNS = ["RIC", "Instrument", "ric", "instrument", "index"]
+
+
+@dataclass
+class BatchFailure:
+    batch: int
+    rics: list[str]
+    error: Exception
+
+
+@dataclass
+class QuoteFetchResult:
+    prices: pd.DataFrame
+    failures: list[BatchFailure] = field(default_factory=list)
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def failed_rics(self) -> list[str]:
+        return [ric for failure in self.failures for ric in failure.rics]
+
+
+def normalize_price_frame(raw: pd.DataFrame, fields=QUOTE_FIELDS) -> pd.DataFrame:
+    """Rename a get_data response to RIC, Bid, Ask, Last whatever the instrument column is called."""
+    raw = raw.reset_index()
+
+    ric_col = None
+    for c in RIC_CANDIDATE_COLUMNS:
+        if c in raw.columns:
+            ric_col = c
+            break
+    if ric_col is None:
+        ric_col = raw.columns[0]
+
+    columns = {ric_col: "RIC", **{f: QUOTE_COLUMNS.get(f, f) for f in fields}}
+    price_df = raw.rename(columns=columns)[list(dict.fromkeys(columns.values()))]
+    price_df["RIC"] = price_df["RIC"].astype(str)
+    return price_df
+
+
+def chunk(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def fetch_quotes(
+        rics: list[str],
+        fields=QUOTE_FIELDS,
+        get_data=None,
+        batch_size: int = 250,
+        max_workers: int = 4,
+        underlying: str = "") -> QuoteFetchResult:
+    """
+    Snapshot quotes for a RIC universe in batches of `batch_size`, with at
+    most `max_workers` batches in flight at once.
+
+    `get_data` is any callable with the `rd.get_data(universe=..., fields=...)`
+    signature and defaults to the process-wide provider's `get_data`; pass a
+    local stand-in such as `LatencyProvider().get_data` to run without a
+    session (benchmarks/quote_latency.py times worker counts that way). A
+    batch that raises is recorded in `failures` and the remaining batches
+    are still returned, concatenated once in batch order.
+    Each batch is timed as the `get_data` stage of `underlying`.
+    """
+    get_data = get_provider().get_data if get_data is None else get_data
+    batches = chunk(list(rics), max(1, batch_size))
+    start = time.perf_counter()
+
+    def _fetch(batch):
+        with metrics.time("get_data", underlying):
+            raw = get_data(universe=batch, fields=list(fields))
+        return normalize_price_frame(raw, fields)
+
+    frames = []
+    failures = []
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+            futures = [pool.submit(_fetch, batch) for batch in batches]
+            for i, future in enumerate(futures):
+                try:
+                    frames.append(future.result())
+                except Exception as e:
+                    failures.append(BatchFailure(batch=i, rics=batches[i], error=e))
+
+    columns = ["RIC"] + [QUOTE_COLUMNS.get(f, f) for f in fields]
+    prices = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+    return QuoteFetchResult(
+        prices=prices,
+        failures=failures,
+        batches=len(batches),
+        elapsed=time.perf_counter() - start,
+    )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second refill a bucket of at
+    most `capacity`, and `acquire()` blocks until enough tokens are available.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        if tokens > self.capacity:
+            raise ValueError(f"cannot acquire {tokens} tokens from a bucket of {self.capacity}")
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def limit(self, fn):
+        """Wrap `fn` so every call first takes one token."""
+        def limited(*args, **kwargs):
+            self.acquire()
+            return fn(*args, **kwargs)
+        return limited
+
+
+# every scan and the refresh daemon draw from this one bucket, so together they stay within the LSEG rate
+lseg_bucket = TokenBucket(float(os.environ.get("DEVILTONGUES_LSEG_RATE", "10")))
+
+
+def limiter(requests_per_second: float | None = None, shared: TokenBucket | None = None):
+    """
+    A wrapper for the calls of one job (a scan, the refresh daemon): each
+    call takes a token from the job's own bucket of `requests_per_second`,
+    when given, then one from `shared` (default `lseg_bucket`). However many
+    jobs run at once, together they never exceed the shared rate.
+    """
+    shared = lseg_bucket if shared is None else shared
+    own = TokenBucket(requests_per_second) if requests_per_second else None
+
+    def limit(fn):
+        fn = shared.limit(fn)
+        return own.limit(fn) if own is not None else fn
+    return limit
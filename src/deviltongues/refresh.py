@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+
+import pandas as pd
+
+from deviltongues.chain import build_surface_df, fetch_option_chain, fetch_spot
+from deviltongues.chain_cache import ChainCache
+from deviltongues.chain_search import ChainQuery
+from deviltongues.metrics import metrics
+from deviltongues.parity import analyze_surface
+from deviltongues.providers import get_provider
+from deviltongues.ratelimit import TokenBucket, limiter
+
+
+@dataclass(frozen=True, eq=False)
+class Snapshot:
+    query: ChainQuery
+    version: int
+    fetched_at: datetime
+    spot: float
+    chain: pd.DataFrame  # discovery rows merged with Bid, Ask, Last
+    surface: pd.DataFrame | None
+    analysis: pd.DataFrame | None  # at the daemon's risk-free rate and threshold
+    elapsed: float
+
+
+class SnapshotStore:
+    """
+    Latest snapshot per ChainQuery, shared by every session in the process.
+
+    Each publish bumps that query's version, so readers can poll `version()`
+    cheaply and only pull the frames when it changes. Snapshots are treated as
+    immutable once published; readers must copy before modifying them.
+    """
+
+    def __init__(self):
+        self._latest: dict[ChainQuery, Snapshot] = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def publish(
+            self,
+            query: ChainQuery,
+            spot: float,
+            chain: pd.DataFrame,
+            surface: pd.DataFrame | None,
+            analysis: pd.DataFrame | None,
+            fetched_at: datetime,
+            elapsed: float = 0.0) -> Snapshot:
+        with self._lock:
+            previous = self._latest.get(query)
+            snapshot = Snapshot(
+                query=query,
+                version=previous.version + 1 if previous is not None else 1,
+                fetched_at=fetched_at,
+                spot=spot,
+                chain=chain,
+                surface=surface,
+                analysis=analysis,
+                elapsed=elapsed,
+            )
+            self._latest[query] = snapshot
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Snapshot listener failed for {query.underlying}: {e}")
+        return snapshot
+
+    def latest(self, query: ChainQuery) -> Snapshot | None:
+        return self._latest.get(query)
+
+    def version(self, query: ChainQuery) -> int:
+        snapshot = self._latest.get(query)
+        return snapshot.version if snapshot is not None else 0
+
+    def queries(self) -> list[ChainQuery]:
+        with self._lock:
+            return list(self._latest)
+
+    def drop(self, query: ChainQuery) -> None:
+        with self._lock:
+            self._latest.pop(query, None)
+
+    def subscribe(self, listener):
+        """Call `listener(snapshot)` after every publish; returns a function that unsubscribes."""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+        return unsubscribe
+
+
+class RefreshDaemon:
+    """
+    Background thread that refreshes every watched ChainQuery each `interval`
+    seconds and publishes the result to a SnapshotStore.
+
+    Sessions `watch()` the query they display and `unwatch()` it when they end;
+    watches are reference counted, so any number of sessions looking at the
+    same chain cost one refresh per cycle between them, and the snapshot is
+    dropped from the store when the last one leaves. Each cycle fetches
+    every distinct spot once, then every chain, concurrently; its calls take
+    tokens from the process-wide `lseg_bucket` (or `bucket`) that the scans
+    share, capped further at `requests_per_second` when given. The thread starts on the first watch and a
+    new watch triggers an immediate cycle.
+    """
+
+    def __init__(
+            self,
+            store: SnapshotStore,
+            interval: float = 60.0,
+            cache: ChainCache | None = None,
+            risk_free_rate: float = 0.05,
+            threshold: float = 0.005,
+            analyze=None,
+            max_workers: int = 4,
+            requests_per_second: float | None = None,
+            bucket: TokenBucket | None = None,
+            search=None,
+            get_data=None):
+        self.store = store
+        self.interval = interval
+        self.cache = cache
+        self.risk_free_rate = risk_free_rate
+        self.threshold = threshold
+        self.analyze = analyze_surface if analyze is None else analyze
+        self.max_workers = max_workers
+
+        limit = limiter(requests_per_second, bucket)
+        self._search = limit(get_provider().search if search is None else search)
+        self._get_data = limit(get_provider().get_data if get_data is None else get_data)
+
+        self._watches: Counter[ChainQuery] = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.cycles = 0
+        self.last_cycle: float = 0.0
+        self.errors: dict[ChainQuery, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def watched(self) -> list[ChainQuery]:
+        with self._lock:
+            return list(self._watches)
+
+    def watch(self, query: ChainQuery) -> None:
+        with self._lock:
+            self._watches[query] += 1
+        self.start()
+        self._wake.set()
+
+    def unwatch(self, query: ChainQuery) -> None:
+        with self._lock:
+            if self._watches[query] > 1:
+                self._watches[query] -= 1
+                return
+            self._watches.pop(query, None)
+        self.errors.pop(query, None)
+        self.store.drop(query)
+
+    def refresh_now(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="deviltongues-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _snapshot(self, query: ChainQuery, spot: float) -> None:
+        fetched_at = datetime.now()
+        t0 = time.perf_counter()
+        chain = fetch_option_chain(query, cache=self.cache, search=self._search, get_data=self._get_data).chain
+        surface = analysis = None
+        if not chain.empty:
+            with metrics.time("build_surface_df", query.underlying):
+                surface = build_surface_df(chain, spot)
+            with metrics.time("analyze_arbitrage", query.underlying):
+                analysis = self.analyze(surface, self.risk_free_rate, self.threshold)
+        self.store.publish(
+            query, spot, chain, surface, analysis,
+            fetched_at=fetched_at,
+            elapsed=time.perf_counter() - t0,
+        )
+
+    def refresh(self, queries: list[ChainQuery] | None = None) -> dict[ChainQuery, str]:
+        """Run one cycle over `queries` (default: everything watched) and return the failures."""
+        watched = queries is None
+        queries = self.watched() if watched else list(queries)
+        errors: dict[ChainQuery, str] = {}
+        if not queries:
+            return errors
+
+        underlyings = list(dict.fromkeys(q.underlying for q in queries))
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(queries)))) as pool:
+            spot_futures = {ric: pool.submit(fetch_spot, ric, get_data=self._get_data) for ric in underlyings}
+            spots = {}
+            for ric, future in spot_futures.items():
+                try:
+                    spots[ric] = future.result()
+                except Exception as e:
+                    for q in queries:
+                        if q.underlying == ric:
+                            errors[q] = f"spot: {e}"
+
+            chain_futures = {
+                q: pool.submit(self._snapshot, q, spots[q.underlying])
+                for q in queries if q.underlying in spots
+            }
+            for q, future in chain_futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[q] = str(e)
+
+        for q in queries:
+            if q in errors:
+                self.errors[q] = errors[q]
+            else:
+                self.errors.pop(q, None)
+        if watched:
+            # a query unwatched while its refresh was in flight was published after unwatch() dropped it
+            with self._lock:
+                gone = [q for q in queries if q not in self._watches]
+            for q in gone:
+                self.errors.pop(q, None)
+                self.store.drop(q)
+        return errors
+
+    def _run(self) -> None:
+        holding = False
+        try:
+            get_provider().open()
+            holding = True
+        except Exception as e:
+            print(f"Refresh daemon could not open the market-data provider, retrying per request: {e}")
+
+        try:
+            while not self._stop.is_set():
+                self._wake.clear()
+                t0 = time.perf_counter()
+                try:
+                    for q, error in self.refresh().items():
+                        print(f"Error refreshing {q.underlying} ({q.filter()}): {error}")
+                except Exception as e:
+                    print(f"Refresh cycle failed: {e}")
+                self.cycles += 1
+                self.last_cycle = time.perf_counter() - t0
+                self._wake.wait(max(0.0, self.interval - self.last_cycle))
+        finally:
+            if holding:
+                get_provider().close()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "watched": len(self._watches),
+            "cycles": self.cycles,
+            "last_cycle": self.last_cycle,
+            "errors": len(self.errors),
+        }
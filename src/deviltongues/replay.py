@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from deviltongues.chain_cache import _safe_name
+from deviltongues.execution import CONTRACT_MULTIPLIER, execution_costs_batch
+from deviltongues.history import HistoryStore
+from deviltongues.parity import parity_kernel, signal_labels
+
+HISTORY_COLUMNS = ["fetched_at", "spot", "CallPutOption", "StrikePrice", "ExpiryDate", "Bid", "Ask", "Last"]
+
+
+@dataclass(frozen=True)
+class ReplayConfig:
+    risk_free_rate: float = 0.05
+    threshold: float = 0.005
+    contracts: int = 10
+    commission: float = 5.0
+    slippage_pct: float = 0.5
+
+
+@dataclass
+class ReplayResult:
+    signals: pd.DataFrame  # one row per signal episode
+    summary: pd.DataFrame
+    errors: dict[tuple[str, date], str] = field(default_factory=dict)
+    partitions: int = 0
+    elapsed: float = 0.0
+
+
+def load_pairs(store: HistoryStore, underlying: str, day: date) -> pd.DataFrame:
+    """
+    Every call/put pair of one name on one day, one row per (snapshot, expiry,
+    strike), with mids and time to expiry measured from each snapshot's fetch
+    time the same way build_surface_df measures it from now.
+    """
+    start = datetime.combine(day, datetime.min.time())
+    df = store.read(underlying, start=start, end=start + timedelta(days=1), columns=HISTORY_COLUMNS)
+
+    df["mid"] = df[["Bid", "Ask"]].mean(axis=1)
+    df.loc[df["mid"].isna(), "mid"] = df["Last"]
+
+    key = ["fetched_at", "ExpiryDate", "StrikePrice"]
+    calls = df.loc[df["CallPutOption"] == "Call", key + ["spot", "mid"]]
+    puts = df.loc[df["CallPutOption"] == "Put", key + ["mid"]]
+    pairs = calls.merge(puts, on=key, suffixes=("_call", "_put"))
+
+    pairs = pairs.rename(columns={"StrikePrice": "K", "spot": "S", "mid_call": "C_mid", "mid_put": "P_mid"})
+    pairs["T"] = (pairs["ExpiryDate"] - pairs["fetched_at"]).dt.days / 365.0
+    return pairs.sort_values(["ExpiryDate", "K", "fetched_at"], kind="stable").reset_index(drop=True)
+
+
+def find_episodes(pairs: pd.DataFrame, config: ReplayConfig) -> pd.DataFrame:
+    """
+    Collapse per-snapshot signals into episodes: a run of consecutive
+    snapshots in which one (expiry, strike) pair keeps flagging the same side.
+
+    Each episode is entered at the mids of its first snapshot and unwound at
+    the mids of the next snapshot if the pair is quoted there with the
+    signal gone (`closed`), or else at its own last snapshot: the signal is
+    still on when the day's data ends, or the pair is missing from the next
+    snapshot. realized_pnl is the mark-to-market change of the three legs less
+    entry and exit costs; financing over the holding period is ignored.
+    expected_pnl is the hold-to-expiry net P&L priced at entry.
+    """
+    implied_r, r_diff, side = parity_kernel(
+        pairs["S"].to_numpy(np.float64),
+        pairs["C_mid"].to_numpy(np.float64),
+        pairs["P_mid"].to_numpy(np.float64),
+        pairs["K"].to_numpy(np.float64),
+        pairs["T"].to_numpy(np.float64),
+        config.risk_free_rate,
+        config.threshold,
+    )
+
+    expiry = pairs["ExpiryDate"].to_numpy()
+    strike = pairs["K"].to_numpy()
+    fetched = pairs["fetched_at"].to_numpy()
+    snap = pd.factorize(pairs["fetched_at"], sort=True)[0]
+
+    same_key = np.r_[False, (expiry[1:] == expiry[:-1]) & (strike[1:] == strike[:-1])]
+    flagged = side != 0
+    continues = same_key & (np.r_[0, side[:-1]] == side) & (np.r_[-2, snap[:-1]] == snap - 1)
+
+    entry = np.flatnonzero(flagged & ~continues)
+    last = np.flatnonzero(flagged & ~np.r_[continues[1:], False])
+    if entry.size == 0:
+        return pd.DataFrame()
+
+    # the signal is only known to be gone if the pair was quoted in the very next snapshot;
+    # after a gap (the pair missing from a snapshot) there is no later mid to unwind at
+    adjacent = same_key & (np.r_[-2, snap[:-1]] == snap - 1)
+    closed = np.r_[adjacent[1:], False][last]
+    exit_ = np.where(closed, last + 1, last)
+
+    entry_frame = pd.DataFrame({
+        "K": strike[entry],
+        "S": pairs["S"].to_numpy()[entry],
+        "C_mid": pairs["C_mid"].to_numpy()[entry],
+        "P_mid": pairs["P_mid"].to_numpy()[entry],
+        "T": pairs["T"].to_numpy()[entry],
+        "r_diff": r_diff[entry],
+        "signal": signal_labels(side[entry]),
+    })
+    exit_frame = pd.DataFrame({
+        "K": strike[exit_],
+        "S": pairs["S"].to_numpy()[exit_],
+        "C_mid": pairs["C_mid"].to_numpy()[exit_],
+        "P_mid": pairs["P_mid"].to_numpy()[exit_],
+        "T": pairs["T"].to_numpy()[exit_],
+        "r_diff": r_diff[exit_],
+        "signal": entry_frame["signal"].to_numpy(),
+    })
+    cost_args = (config.contracts, config.commission, config.slippage_pct, config.risk_free_rate)
+    entry_costs = execution_costs_batch(entry_frame, *cost_args)
+    exit_costs = execution_costs_batch(exit_frame, *cost_args)
+
+    # sell synthetic (+1): short call, long put, long stock; buy synthetic (-1) the opposite
+    move = (
+        -(exit_frame["C_mid"] - entry_frame["C_mid"])
+        + (exit_frame["P_mid"] - entry_frame["P_mid"])
+        + (exit_frame["S"] - entry_frame["S"])
+    ).to_numpy()
+    gross = side[entry] * move * config.contracts * CONTRACT_MULTIPLIER
+    realized = gross - entry_costs["total_costs"].to_numpy() - exit_costs["total_costs"].to_numpy()
+
+    peak = np.maximum.reduceat(np.where(flagged, np.abs(r_diff), 0.0), entry)
+
+    return pd.DataFrame({
+        "ExpiryDate": expiry[entry],
+        "K": strike[entry],
+        "side": side[entry],
+        "signal": entry_frame["signal"],
+        "strategy_type": entry_costs["strategy_type"].to_numpy(),
+        "entry_time": fetched[entry],
+        "exit_time": fetched[exit_],
+        "closed": closed,
+        "persistence": last - entry + 1,
+        "duration_s": (fetched[last] - fetched[entry]) / np.timedelta64(1, "s"),
+        "entry_implied_r": implied_r[entry],
+        "entry_r_diff": r_diff[entry],
+        "peak_abs_r_diff": peak,
+        "expected_pnl": entry_costs["net_pnl"].to_numpy(),
+        "gross_pnl": gross,
+        "realized_pnl": realized,
+        "hit": realized > 0,
+    })
+
+
+def replay_partition(root: str | Path, underlying: str, day: date, config: ReplayConfig = ReplayConfig()) -> pd.DataFrame:
+    """Signal episodes of one name on one day; the unit of work sent to each worker process."""
+    episodes = find_episodes(load_pairs(HistoryStore(root), underlying, day), config)
+    if not episodes.empty:
+        episodes.insert(0, "date", day)
+        episodes.insert(0, "underlying", underlying)
+    return episodes
+
+
+def summarize(signals: pd.DataFrame, by=("underlying", "strategy_type")) -> pd.DataFrame:
+    """Hit rate, P&L and persistence per group of signal episodes."""
+    if signals.empty:
+        return pd.DataFrame()
+    return (
+        signals.groupby(list(by), observed=True)
+        .agg(
+            signals=("realized_pnl", "size"),
+            hit_rate=("hit", "mean"),
+            realized_pnl=("realized_pnl", "sum"),
+            mean_realized_pnl=("realized_pnl", "mean"),
+            expected_pnl=("expected_pnl", "sum"),
+            mean_persistence=("persistence", "mean"),
+            median_duration_s=("duration_s", "median"),
+            closed_rate=("closed", "mean"),
+        )
+        .reset_index()
+    )
+
+
+def replay(
+        store: HistoryStore,
+        underlyings: list[str] | None = None,
+        start: date | None = None,
+        end: date | None = None,
+        config: ReplayConfig = ReplayConfig(),
+        max_workers: int | None = None) -> ReplayResult:
+    """
+    Replay every stored (underlying, day) partition within `start`..`end`
+    (inclusive) through the parity and execution-cost logic.
+
+    Partitions are independent, so each one is replayed in its own task on a
+    process pool of `max_workers` (default: one per core); `max_workers=1`
+    runs them inline. A partition that fails is reported in `errors`.
+    """
+    t0 = time.perf_counter()
+    wanted = None if underlyings is None else {_safe_name(u) for u in underlyings}
+    tasks = [
+        (u, d) for u, d in store.partitions()
+        if (wanted is None or u in wanted) and (start is None or d >= start) and (end is None or d <= end)
+    ]
+
+    frames = []
+    errors = {}
+    if max_workers == 1 or len(tasks) <= 1:
+        for u, d in tasks:
+            try:
+                frames.append(replay_partition(store.root, u, d, config))
+            except Exception as e:
+                errors[(u, d)] = str(e)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            futures = {(u, d): pool.submit(replay_partition, str(store.root), u, d, config) for u, d in tasks}
+            for task, future in futures.items():
+                try:
+                    frames.append(future.result())
+                except Exception as e:
+                    errors[task] = str(e)
+
+    frames = [f for f in frames if not f.empty]
+    signals = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    return ReplayResult(
+        signals=signals,
+        summary=summarize(signals),
+        errors=errors,
+        partitions=len(tasks),
+        elapsed=time.perf_counter() - t0,
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay stored chain snapshots through the parity signals.")
+    parser.add_argument("--root", help="history directory (default: DEVILTONGUES_HISTORY_DIR)")
+    parser.add_argument("--underlying", action="append", help="RIC to replay; repeat for several (default: all)")
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    parser.add_argument("--risk-free-rate", type=float, default=0.05)
+    parser.add_argument("--threshold", type=float, default=0.005)
+    parser.add_argument("--contracts", type=int, default=10)
+    parser.add_argument("--commission", type=float, default=5.0)
+    parser.add_argument("--slippage-pct", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="write the per-signal table to this Parquet file")
+    args = parser.parse_args(argv)
+
+    config = ReplayConfig(
+        risk_free_rate=args.risk_free_rate,
+        threshold=args.threshold,
+        contracts=args.contracts,
+        commission=args.commission,
+        slippage_pct=args.slippage_pct,
+    )
+    result = replay(HistoryStore(args.root), args.underlying, args.start, args.end, config, args.workers)
+
+    print(f"Replayed {result.partitions} partitions, {len(result.signals)} signals in {result.elapsed:.1f}s")
+    for (u, d), error in result.errors.items():
+        print(f"Error replaying {u} {d}: {error}")
+    if not result.summary.empty:
+        print(result.summary.to_string(index=False))
+    if args.output and not result.signals.empty:
+        result.signals.to_parquet(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
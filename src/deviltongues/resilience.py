@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without calling the backend while the circuit breaker is open."""
+
+
+class ExecutorSaturated(TimeoutError):
+    """
+    Raised without calling the backend when this process has no worker to
+    spare: every slot stayed busy for the whole timeout, or too many
+    abandoned requests are still running. Says nothing about LSEG itself,
+    so it is neither retried nor counted against the circuit breaker.
+    """
+
+
+@dataclass(frozen=True, eq=False)
+class RetryPolicy:
+    """
+    How one endpoint is called: `timeout` seconds per attempt, at most
+    `attempts` attempts, and between them a sleep drawn uniformly from
+    [0, min(max_backoff, backoff * 2**retry)] ("full jitter").
+    """
+    timeout: float = 30.0
+    attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 8.0
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0.0, min(self.max_backoff, self.backoff * 2 ** retry))
+
+
+DEFAULT_POLICIES = {
+    "search": RetryPolicy(timeout=30.0),
+    "get_data": RetryPolicy(timeout=20.0),
+    "get_history": RetryPolicy(timeout=60.0),
+    "ipa": RetryPolicy(timeout=120.0, attempts=2),
+}
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Whether `error` is worth retrying and counts against the backend: anything
+    but a caller mistake (bad arguments, or an HTTP 4xx other than 408/429).
+    """
+    if isinstance(error, (CircuitOpenError, ExecutorSaturated)):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, (TypeError, ValueError, LookupError)):
+        return False
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and 400 <= code < 500:
+        return code in (408, 429)
+    return True
+
+
+class CircuitBreaker:
+    """
+    Closed until `failure_threshold` transient failures in a row, then open:
+    calls fail fast for `reset_after` seconds. After that one trial call is
+    let through (half open); its success closes the breaker and its failure
+    opens it again. A call that proves nothing either way (a caller mistake)
+    is `release`d: it neither resets the failure count nor ends the trial
+    with a verdict, it only lets the next trial through.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.opens = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_after:
+                self.state = HALF_OPEN
+                self._trial = False
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._trial = False
+
+    def release(self) -> None:
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opens += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return max(0.0, self.reset_after - (time.monotonic() - self._opened_at)) if self.state == OPEN else 0.0
+
+
+class _Attempt:
+    """One call on its own worker thread; `abandoned` once its caller stopped waiting."""
+    __slots__ = ("future", "done", "abandoned")
+
+    def __init__(self):
+        self.future = Future()
+        self.done = self.abandoned = False
+
+
+class _Counters:
+    __slots__ = ("calls", "retries", "timeouts", "failures", "rejected", "saturated")
+
+    def __init__(self):
+        self.calls = self.retries = self.timeouts = self.failures = self.rejected = self.saturated = 0
+
+
+class RequestExecutor:
+    """
+    Every LSEG call goes through `call(endpoint, fn, ...)`.
+
+    Each attempt runs on a worker thread of its own and is waited on for the
+    endpoint's timeout, so a hung request costs the caller at most that long.
+    At most `max_workers` attempts are waited on at once. A worker that
+    timed out is abandoned: it gives its slot back at once and finishes (or
+    hangs) on its own, so hung requests never hold up later calls. Once
+    `max_abandoned` of them are still running, new attempts fail with
+    ExecutorSaturated without starting another thread, as they do when no
+    slot frees up within the timeout; only real deadline misses count
+    against the breaker.
+    Transient failures are retried with exponential backoff and full jitter.
+    One circuit breaker covers the whole backend: while it is open, calls
+    raise CircuitOpenError at once instead of sleeping through retries.
+    Calls, retries, timeouts, failures, rejections and saturations are
+    counted per endpoint, abandoned workers still running in total; see
+    `stats()`.
+    """
+
+    def __init__(
+            self,
+            policies: dict[str, RetryPolicy] | None = None,
+            breaker: CircuitBreaker | None = None,
+            max_workers: int = 16,
+            max_abandoned: int = 64,
+            transient=is_transient):
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.transient = transient
+        self.max_abandoned = max_abandoned
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._abandoned = 0
+        self._counters: dict[str, _Counters] = {}
+        self._lock = threading.Lock()
+
+    def policy(self, endpoint: str) -> RetryPolicy:
+        return self.policies.get(endpoint) or RetryPolicy()
+
+    def _count(self, endpoint: str, name: str) -> None:
+        with self._lock:
+            counters = self._counters.get(endpoint)
+            if counters is None:
+                counters = self._counters[endpoint] = _Counters()
+            setattr(counters, name, getattr(counters, name) + 1)
+
+    def _run(self, attempt: _Attempt, fn, args, kwargs) -> None:
+        try:
+            attempt.future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            attempt.future.set_exception(e)
+        finally:
+            with self._lock:
+                attempt.done = True
+                if attempt.abandoned:
+                    self._abandoned -= 1
+            if not attempt.abandoned:
+                self._slots.release()
+
+    def _attempt(self, endpoint: str, timeout: float, fn, args, kwargs):
+        with self._lock:
+            hung = self._abandoned
+        if hung >= self.max_abandoned:
+            self._count(endpoint, "saturated")
+            raise ExecutorSaturated(f"LSEG {endpoint} not called: {hung} earlier requests are still hung")
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=timeout):
+            self._count(endpoint, "saturated")
+            raise ExecutorSaturated(f"LSEG {endpoint} found no free worker within {timeout:g}s")
+
+        attempt = _Attempt()
+        threading.Thread(target=self._run, args=(attempt, fn, args, kwargs), name=f"lseg-{endpoint}", daemon=True).start()
+        try:
+            return attempt.future.result(timeout=max(0.0, timeout - (time.monotonic() - started)))
+        except FutureTimeout:
+            with self._lock:
+                if not attempt.done:
+                    attempt.abandoned = True
+                    self._abandoned += 1
+            if not attempt.abandoned:  # finished just as the wait ran out
+                return attempt.future.result()
+            self._slots.release()
+            self._count(endpoint, "timeouts")
+            raise TimeoutError(f"LSEG {endpoint} did not answer within {timeout:g}s") from None
+
+    def call(self, endpoint: str, fn, *args, **kwargs):
+        """`fn(*args, **kwargs)` under the policy of `endpoint`; re-raises the last error."""
+        policy = self.policy(endpoint)
+        self._count(endpoint, "calls")
+        retry = 0
+        while True:
+            if not self.breaker.allow():
+                self._count(endpoint, "rejected")
+                raise CircuitOpenError(
+                    f"LSEG is unavailable; not calling {endpoint} for another {self.breaker.retry_in():.1f}s")
+            try:
+                result = self._attempt(endpoint, policy.timeout, fn, args, kwargs)
+            except Exception as e:
+                if isinstance(e, ExecutorSaturated) or not self.transient(e):
+                    self.breaker.release()  # a caller mistake or a local backlog says nothing about the backend
+                    raise
+                self.breaker.record_failure()
+                retry += 1
+                if retry >= policy.attempts:
+                    self._count(endpoint, "failures")
+                    raise
+                self._count(endpoint, "retries")
+                time.sleep(policy.delay(retry - 1))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {
+                endpoint: {name: getattr(c, name) for name in _Counters.__slots__}
+                for endpoint, c in self._counters.items()
+            }
+            abandoned = self._abandoned
+        return {
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "abandoned": abandoned,
+            "endpoints": endpoints,
+            **{name: sum(e[name] for e in endpoints.values()) for name in _Counters.__slots__},
+        }
+
+    def prometheus_text(self, prefix: str = "deviltongues_lseg") -> str:
+        """Counters per endpoint and the breaker state, in Prometheus text exposition."""
+        stats = self.stats()
+        lines = []
+        for name in _Counters.__slots__:
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for endpoint, counters in sorted(stats["endpoints"].items()):
+                lines.append(f'{prefix}_{name}_total{{endpoint="{endpoint}"}} {counters[name]}')
+        lines.append(f"# HELP {prefix}_breaker_state 0 closed, 1 half open, 2 open.")
+        lines.append(f"# TYPE {prefix}_breaker_state gauge")
+        lines.append(f"{prefix}_breaker_state {(CLOSED, HALF_OPEN, OPEN).index(stats['breaker'])}")
+        lines.append(f"# TYPE {prefix}_breaker_opens_total counter")
+        lines.append(f"{prefix}_breaker_opens_total {stats['breaker_opens']}")
+        lines.append(f"# HELP {prefix}_abandoned_workers Timed-out requests whose worker is still running.")
+        lines.append(f"# TYPE {prefix}_abandoned_workers gauge")
+        lines.append(f"{prefix}_abandoned_workers {stats['abandoned']}")
+        return "\n".join(lines) + "\n"
+
+
+request_executor = RequestExecutor()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+
+import pandas as pd
+
+from deviltongues.chain import build_surface_df, fetch_option_chain, fetch_spot
+from deviltongues.chain_cache import ChainCache
+from deviltongues.chain_search import ChainQuery
+from deviltongues.execution import execution_costs_batch
+from deviltongues.metrics import metrics
+from deviltongues.parity import analyze_surface
+from deviltongues.providers import get_provider
+from deviltongues.ratelimit import TokenBucket, limiter
+
+
+@dataclass
+class MultiScanResult:
+    opportunities: pd.DataFrame
+    errors: dict[str, str] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def scan_underlyings(
+        underlyings: list[str],
+        min_expiry: date,
+        max_expiry: date,
+        strike_band: float = 0.2,
+        risk_free_rate: float = 0.05,
+        threshold: float = 0.005,
+        contracts: int = 10,
+        commission: float = 5.0,
+        slippage_pct: float = 0.5,
+        max_workers: int = 8,
+        requests_per_second: float | None = None,
+        bucket: TokenBucket | None = None,
+        cache: ChainCache | None = None,
+        search=None,
+        get_data=None,
+        analyze=None) -> MultiScanResult:
+    """
+    Fetch spot and chain for every underlying concurrently and run the parity
+    analysis per name.
+
+    Each chain is scanned for strikes within `strike_band` of that name's spot.
+    Every LSEG call from every underlying (spot, searches, quote batches) takes
+    a token from the process-wide `lseg_bucket` (or `bucket`), which the
+    refresh daemon and every other scan share, so all of them together stay
+    inside one global rate limit; `requests_per_second` caps this scan
+    further. The opportunities of all names are
+    returned in one table, with an Underlying column and execution costs, ranked
+    by after-cost net P&L. A name that fails is reported in `errors` and does
+    not stop the others.
+    """
+    limit = limiter(requests_per_second, bucket)
+    search = limit(get_provider().search if search is None else search)
+    get_data = limit(get_provider().get_data if get_data is None else get_data)
+    analyze = analyze_surface if analyze is None else analyze
+    start = time.perf_counter()
+
+    def _scan_one(ric: str) -> pd.DataFrame:
+        t0 = time.perf_counter()
+        spot = fetch_spot(ric, get_data=get_data)
+        query = ChainQuery(
+            underlying=ric,
+            min_strike=round(spot * (1 - strike_band)),
+            max_strike=round(spot * (1 + strike_band)),
+            min_expiry=min_expiry,
+            max_expiry=max_expiry,
+        )
+        fetched = fetch_option_chain(query, cache=cache, search=search, get_data=get_data)
+        if fetched.chain.empty:
+            arb = pd.DataFrame()
+        else:
+            with metrics.time("build_surface_df", ric):
+                surface = build_surface_df(fetched.chain, spot)
+            with metrics.time("analyze_arbitrage", ric):
+                arb = analyze(surface, risk_free_rate, threshold)
+        timings[ric] = time.perf_counter() - t0
+        return arb
+
+    timings: dict[str, float] = {}
+    errors: dict[str, str] = {}
+    frames = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(underlyings) or 1))) as pool:
+        futures = {ric: pool.submit(_scan_one, ric) for ric in underlyings}
+        for ric, future in futures.items():
+            try:
+                arb = future.result()
+            except Exception as e:
+                errors[ric] = str(e)
+                continue
+            if not arb.empty:
+                frames.append(arb.assign(Underlying=ric))
+
+    if frames:
+        opportunities = pd.concat(frames, ignore_index=True)
+        costs = execution_costs_batch(opportunities, contracts, commission, slippage_pct, risk_free_rate)
+        opportunities = (
+            pd.concat([opportunities, costs], axis=1)
+            .sort_values("net_pnl", ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
+    else:
+        opportunities = pd.DataFrame()
+
+    return MultiScanResult(
+        opportunities=opportunities,
+        errors=errors,
+        timings=timings,
+        elapsed=time.perf_counter() - start,
+    )
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+OPTION_TYPE = pd.CategoricalDtype(["Call", "Put"])
+DAY_NS = 86_400 * 10**9
+
+# Quotes are cents on prices below ~1e5 and strikes at most a few decimals, well
+# inside float32's 7 significant digits; rates and everything derived from them
+# are computed in float64 (implied_rate upcasts its inputs).
+CHAIN_DTYPES = {
+    "RIC": "string[pyarrow]",
+    "CallPutOption": OPTION_TYPE,
+    "StrikePrice": np.float32,
+    "Bid": np.float32,
+    "Ask": np.float32,
+    "Last": np.float32,
+}
+
+# build_surface_df output. RIC, CallPutOption and K share the chain's buffers;
+# the spot is a scalar in `attrs["spot"]` and the expiry an int32 day number
+# (days since 1970-01-01), see expiry_dates().
+SURFACE_DTYPES = {
+    "RIC": "string[pyarrow]",
+    "CallPutOption": OPTION_TYPE,
+    "K": np.float32,
+    "ExpiryDay": np.int32,
+    "T": np.float32,
+    "mid": np.float32,
+}
+
+
+def as_option_type(values: pd.Series) -> pd.Series:
+    """Call/Put strings, in any case, as the OPTION_TYPE categorical."""
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.dtype == OPTION_TYPE:
+        return values
+    # exact spellings by comparison (pd.factorize sizes its hash table by rows, not distinct values),
+    # anything else through factorize and normalization
+    array = values.to_numpy(dtype=object)
+    codes = np.full(len(array), -1, dtype=np.int8)
+    for code, name in enumerate(OPTION_TYPE.categories):
+        codes[array == name] = code
+    rest = np.flatnonzero((codes < 0) & pd.notna(array))
+    if len(rest):
+        found, uniques = pd.factorize(array[rest])
+        normalized = pd.Index(uniques).astype(str).str.strip().str.capitalize()
+        lookup = np.append(OPTION_TYPE.categories.get_indexer(normalized), -1)  # code -1 (missing) stays missing
+        codes[rest] = lookup[found]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=OPTION_TYPE), index=values.index, name=values.name)
+
+
+def as_ric(values: pd.Series) -> pd.Series:
+    """
+    RICs as Arrow strings: one contiguous buffer instead of a Python object
+    per contract. RICs are unique within a chain, so a categorical buys
+    nothing, and pandas keeps an object-dtype hash table of the categories
+    alive as soon as they are validated, as large as the column it replaced.
+    """
+    if values.dtype == CHAIN_DTYPES["RIC"]:
+        return values
+    return values.astype(CHAIN_DTYPES["RIC"])
+
+
+def compact_chain(chain: pd.DataFrame, prices: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    A chain (RIC, CallPutOption, StrikePrice, ExpiryDate, Bid, Ask, Last)
+    with CHAIN_DTYPES applied and ExpiryDate parsed; other columns are left
+    alone. Non-numeric quotes become NaN.
+
+    When `prices` (RIC plus quote columns) is given, its columns are attached
+    by RIC during the conversion, like a left merge on RIC but without
+    materializing the merged object-dtype frame first; duplicate quote rows
+    keep the first. The result is the one owned copy of the chain; its
+    columns are not consolidated into blocks, so build_surface_df can share
+    them instead of copying.
+    """
+    columns = {name: _compact_column(name, col) for name, col in chain.items()}
+    if prices is not None:
+        rows = _quote_rows(chain["RIC"], prices["RIC"])
+        for name, col in prices.items():
+            if name == "RIC":
+                continue
+            values = _compact_column(name, col)
+            if rows is not None:
+                values = values.array if isinstance(values.dtype, pd.api.extensions.ExtensionDtype) else values.to_numpy()
+                values = pd.api.extensions.take(values, rows, allow_fill=True)
+            columns[name] = pd.Series(values, index=chain.index, copy=False)
+    return pd.DataFrame(columns, index=chain.index, copy=False)
+
+
+def _quote_rows(ric: pd.Series, quote_ric: pd.Series) -> np.ndarray | None:
+    """
+    Row in `quote_ric` of each RIC's first quote, -1 where it has none, or
+    None when the quotes line up with `ric` row for row. fetch_quotes keeps
+    the request order, so that is the usual case and needs no hashing.
+    """
+    if len(ric) == len(quote_ric) and (ric.to_numpy() == quote_ric.to_numpy()).all():
+        return None
+    first = np.flatnonzero(~quote_ric.duplicated().to_numpy())
+    found = pd.Index(quote_ric.iloc[first]).get_indexer(ric)
+    return np.append(first, -1)[found]  # -1 (not found) picks the appended -1
+
+
+def _compact_column(name: str, col: pd.Series) -> pd.Series:
+    dtype = CHAIN_DTYPES.get(name)
+    if dtype is OPTION_TYPE:
+        return as_option_type(col)
+    if dtype == CHAIN_DTYPES["RIC"]:
+        return as_ric(col)
+    if dtype is not None:
+        return pd.to_numeric(col, errors="coerce").astype(dtype, copy=False)
+    if name == "ExpiryDate":
+        return as_datetime(col)
+    return col
+
+
+def as_datetime(values: pd.Series) -> pd.Series:
+    """pd.to_datetime, skipped for columns that already are datetime64 (it re-parses them element by element)."""
+    return values if pd.api.types.is_datetime64_dtype(values.dtype) else pd.to_datetime(values)
+
+
+def expiry_days(expiry: pd.Series) -> np.ndarray:
+    """int32 day numbers of datetime-like expiries; the time of day is dropped."""
+    nanos = as_datetime(expiry).to_numpy("datetime64[ns]").view(np.int64)
+    return (nanos // DAY_NS).astype(np.int32)
+
+
+def expiry_dates(days) -> np.ndarray:
+    """Inverse of `expiry_days`: datetime64[ns] midnights."""
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def years_to_expiry(days, now: pd.Timestamp) -> np.ndarray:
+    """Whole days from `now` to each expiry midnight, over 365; same as (ExpiryDate - now).dt.days / 365."""
+    today = -(-pd.Timestamp(now).value // DAY_NS)  # floor((day * DAY_NS - now) / DAY_NS) == day - ceil(now / DAY_NS)
+    remaining = np.subtract(days, today, dtype=np.int32)
+    return np.divide(remaining, 365.0, dtype=np.float32)
+
+
+def mid_price(bid: np.ndarray, ask: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """float32 mean of bid and ask, the one that is quoted if the other is NaN, else the last price."""
+    mid = np.add(bid, ask, dtype=np.float32)
+    mid /= 2
+    np.copyto(mid, ask, where=np.isnan(bid), casting="same_kind")
+    np.copyto(mid, bid, where=np.isnan(ask), casting="same_kind")
+    np.copyto(mid, last, where=np.isnan(mid), casting="same_kind")
+    return mid
+
+
+def memory_report(**frames: pd.DataFrame | None) -> pd.DataFrame:
+    """
+    Rows, columns and memory (MB) of each frame, plus a total row.
+
+    Unlike `memory_usage(deep=True)`, objects referenced from several places
+    (category dictionaries shared between frames, the same Python string in
+    many rows) are counted once, in the first frame that holds them, so the
+    total is what the frames really keep alive together.
+    """
+    seen: set[int] = set()
+
+    def once(obj) -> int:
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        return sys.getsizeof(obj)
+
+    def column_bytes(col: pd.Series) -> int:
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            size = col.cat.codes.to_numpy().nbytes
+            categories = col.cat.categories
+            if id(categories) not in seen:
+                seen.add(id(categories))
+                if categories.dtype == object:
+                    size += categories.to_numpy().nbytes + sum(once(v) for v in categories.to_numpy())
+                else:
+                    size += categories.nbytes
+            return size
+        if not isinstance(col.array, np.ndarray | pd.arrays.NumpyExtensionArray):
+            return col.array.nbytes  # Arrow and other extension arrays report their buffers
+        values = col.to_numpy()
+        if values.dtype == object:
+            return values.nbytes + sum(once(v) for v in values)
+        return col.array.nbytes
+
+    rows = [
+        {
+            "frame": name,
+            "rows": len(df),
+            "columns": df.shape[1],
+            "mb": (df.index.memory_usage() + sum(column_bytes(col) for _, col in df.items())) / 2**20,
+        }
+        for name, df in frames.items() if df is not None
+    ]
+    report = pd.DataFrame(rows, columns=["frame", "rows", "columns", "mb"])
+    total = {"frame": "total", "rows": report["rows"].sum(), "columns": report["columns"].sum(), "mb": report["mb"].sum()}
+    return pd.concat([report, pd.DataFrame([total])], ignore_index=True)
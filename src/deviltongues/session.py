@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+
+import refinitiv.data as rd
+
+
+class SessionManager:
+    """
+    One LSEG session per process, shared by every Shiny session, script and
+    helper that needs it.
+
+    `acquire()` / `release()` are reference counted: the first acquire opens
+    the session and the last release closes it, so one browser tab closing no
+    longer tears down everyone else's connection. Calls made through `call()`
+    or `request()` hold a reference of their own while they run, so the
+    session cannot close under them, reopen a dropped session with
+    exponential backoff and are limited to `max_concurrent` in flight at
+    once. Without any other holder the session closes again after each call;
+    scripts making many calls should hold it with `session()`.
+    """
+
+    def __init__(
+            self,
+            max_concurrent: int = 8,
+            max_retries: int = 5,
+            backoff: float = 0.5,
+            max_backoff: float = 30.0,
+            **open_kwargs):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._open_kwargs = open_kwargs
+        self._session = None
+        self._refs = 0
+        self._lock = threading.RLock()
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self.reconnects = 0
+
+    def configure(self, **open_kwargs) -> None:
+        """Arguments for `rd.open_session` (name, app_key, config_name) used on the next open."""
+        with self._lock:
+            self._open_kwargs = open_kwargs
+
+    @property
+    def refs(self) -> int:
+        return self._refs
+
+    def is_open(self) -> bool:
+        session = self._session
+        return session is not None and session.open_state == rd.OpenState.Opened
+
+    def _open(self, retries: int) -> None:
+        attempt = 0
+        while True:
+            try:
+                self._session = rd.open_session(**self._open_kwargs)
+                if self.is_open():
+                    return
+                raise ConnectionError(f"LSEG session is {self._session.open_state}")
+            except Exception:
+                if attempt >= retries:
+                    raise
+                time.sleep(min(self.max_backoff, self.backoff * 2 ** attempt))
+                attempt += 1
+
+    def _ensure_open(self, retries: int | None = None) -> None:
+        if self.is_open():
+            return
+        with self._lock:
+            if self.is_open():
+                return
+            if self._session is not None:
+                self.reconnects += 1
+            self._open(self.max_retries if retries is None else retries)
+
+    def acquire(self, retries: int | None = None) -> None:
+        with self._lock:
+            self._ensure_open(retries)
+            self._refs += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._refs = max(0, self._refs - 1)
+            if self._refs == 0 and self._session is not None:
+                try:
+                    rd.close_session()
+                finally:
+                    self._session = None
+
+    @contextmanager
+    def session(self):
+        """Hold a reference for the duration of a block, e.g. in a script."""
+        self.acquire()
+        try:
+            yield self._session
+        finally:
+            self.release()
+
+    @contextmanager
+    def request(self):
+        """An open session, held by a reference, and one of the `max_concurrent` request slots."""
+        self.acquire()
+        try:
+            with self._slots:
+                yield self._session
+        finally:
+            self.release()
+
+    def call(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)`, e.g. `rd.get_data`, through `request()`."""
+        with self.request():
+            return fn(*args, **kwargs)
+
+
+session_manager = SessionManager()
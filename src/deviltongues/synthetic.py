@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from deviltongues.black_scholes import black_scholes_price
+
+CHAIN_COLUMNS = ["RIC", "CallPutOption", "StrikePrice", "ExpiryDate", "Bid", "Ask", "Last"]
+
+# OPRA RIC month codes: calls A-L, puts M-X
+_CALL_MONTHS = np.array(list("ABCDEFGHIJKL"))
+_PUT_MONTHS = np.array(list("MNOPQRSTUVWX"))
+
+
+@dataclass(frozen=True)
+class ChainSpec:
+    """
+    Everything that shapes a synthetic chain. Strikes run from
+    `strike_range[0] * spot` to `strike_range[1] * spot` in `strikes` steps;
+    expiries are `expiries` dates `expiry_step_days` apart from the next
+    Friday. Volatility follows a quadratic smile in log-moneyness.
+    """
+    underlying: str = "SYN.O"
+    spot: float = 100.0
+    strikes: int = 50
+    strike_range: tuple[float, float] = (0.7, 1.3)
+    expiries: int = 12
+    expiry_step_days: int = 7
+    volatility: float = 0.25
+    skew: float = -0.15
+    smile: float = 0.3
+    risk_free_rate: float = 0.05
+    dividend_yield: float = 0.0
+    spread_pct: float = 0.02  # full bid/ask spread as a fraction of the option price
+    min_spread: float = 0.01
+    tick: float = 0.01
+    violation_rate: float = 0.0  # fraction of call/put pairs with an injected parity violation
+    violation_size: float = 0.02  # shift of the pair's implied rate, annualized
+    missing_rate: float = 0.0  # fraction of contracts with no bid/ask
+
+    @property
+    def contracts(self) -> int:
+        return 2 * self.strikes * self.expiries
+
+    def sized(self, contracts: int, expiries: int | None = None) -> ChainSpec:
+        """Same spec with the strike count chosen to give about `contracts` rows."""
+        expiries = self.expiries if expiries is None else expiries
+        return replace(self, expiries=expiries, strikes=max(1, contracts // (2 * expiries)))
+
+
+def _expiry_dates(spec: ChainSpec, now: datetime) -> pd.DatetimeIndex:
+    today = pd.Timestamp(now).normalize()
+    first = today + pd.Timedelta(days=(4 - today.weekday()) % 7 or 7)
+    return first + pd.to_timedelta(np.arange(spec.expiries) * spec.expiry_step_days, unit="D")
+
+
+def _rics(root: str, strike_grid: np.ndarray, expiry_dates: pd.DatetimeIndex, months: np.ndarray) -> np.ndarray:
+    """OPRA-style RICs (e.g. SYNA172610000.U) for the strike-major (strike, expiry) grid."""
+    date_part = np.array([f"{root}{months[d.month - 1]}{d.day:02d}{d.year % 100:02d}" for d in expiry_dates], dtype=object)
+    strike_part = np.array([f"{int(round(k * 100)):05d}.U" for k in strike_grid], dtype=object)
+    return np.tile(date_part, len(strike_part)) + np.repeat(strike_part, len(date_part))
+
+
+def _quote(price: np.ndarray, spec: ChainSpec, rng: np.random.Generator):
+    half = np.maximum(spec.min_spread, spec.spread_pct * price) / 2
+    bid = np.maximum(np.floor((price - half) / spec.tick) * spec.tick, 0.0)
+    ask = np.ceil((price + half) / spec.tick) * spec.tick
+    last = np.round((bid + (ask - bid) * rng.uniform(0.25, 0.75, price.size)) / spec.tick) * spec.tick
+    if spec.missing_rate > 0:
+        missing = rng.random(price.size) < spec.missing_rate
+        bid = np.where(missing, np.nan, bid)
+        ask = np.where(missing, np.nan, ask)
+    return bid, ask, last
+
+
+def generate_chain(
+        spec: ChainSpec = ChainSpec(),
+        now: datetime | None = None,
+        seed: int | None = None,
+        with_truth: bool = False,
+        spot: float | None = None):
+    """
+    A chain in exactly the shape `fetch_option_chain` returns: RIC,
+    CallPutOption, StrikePrice, ExpiryDate, Bid, Ask, Last, with all calls
+    followed by all puts.
+
+    Prices are Black-Scholes at the smile volatility, quoted around the model
+    price with `spec.spread_pct` spreads rounded to `spec.tick`. In
+    `spec.violation_rate` of the pairs one leg is moved so the pair's
+    parity-implied rate is off by +/- `spec.violation_size`. With
+    `with_truth=True` the per-pair model values and injected shifts are
+    returned as well, as (chain, truth). `spot` prices the chain off a
+    different underlying price while keeping the strikes laid out around
+    `spec.spot`. Everything is vectorized, so a million contracts take about
+    a second.
+    """
+    rng = np.random.default_rng(seed)
+    now = datetime.now() if now is None else now
+
+    expiry_dates = _expiry_dates(spec, now)
+    strike_grid = np.round(np.linspace(spec.spot * spec.strike_range[0], spec.spot * spec.strike_range[1], spec.strikes), 2)
+    K = np.repeat(strike_grid, spec.expiries)
+    expiry = pd.DatetimeIndex(np.tile(expiry_dates.to_numpy(), spec.strikes))
+    T = (expiry - pd.Timestamp(now)).days.to_numpy() / 365.0
+
+    S = spec.spot if spot is None else spot
+    forward = S * np.exp((spec.risk_free_rate - spec.dividend_yield) * np.maximum(T, 0))
+    m = np.log(K / forward)
+    sigma = np.maximum(spec.volatility + spec.skew * m + spec.smile * m ** 2, 0.01)
+    T_priced = np.maximum(T, 1e-8)  # contracts expiring today are priced at intrinsic value rather than NaN
+    call = black_scholes_price(S, K, T_priced, spec.risk_free_rate, sigma, spec.dividend_yield, call=True)
+    put = black_scholes_price(S, K, T_priced, spec.risk_free_rate, sigma, spec.dividend_yield, call=False)
+
+    # Shift one leg so that S - C + P = K * exp(-(r_implied + shift) * T) for the chosen pairs
+    shift = np.zeros(K.size)
+    if spec.violation_rate > 0:
+        chosen = rng.random(K.size) < spec.violation_rate
+        shift[chosen] = spec.violation_size * rng.choice([-1.0, 1.0], chosen.sum())
+        delta = K * np.exp(-spec.risk_free_rate * T) * (np.exp(-shift * T) - 1)  # change in S - C + P
+        call_moved = call - delta
+        use_call = call_moved > spec.tick
+        call = np.where(use_call, call_moved, call)
+        put = np.where(use_call, put, put + delta)
+
+    bid, ask, last = _quote(np.r_[call, put], spec, rng)
+    root = spec.underlying.split(".")[0]
+
+    chain = pd.DataFrame({
+        "RIC": np.r_[
+            _rics(root, strike_grid, expiry_dates, _CALL_MONTHS),
+            _rics(root, strike_grid, expiry_dates, _PUT_MONTHS),
+        ],
+        "CallPutOption": np.repeat(np.array(["Call", "Put"], dtype=object), K.size),
+        "StrikePrice": np.r_[K, K],
+        "ExpiryDate": np.r_[expiry.to_numpy(), expiry.to_numpy()],
+        "Bid": bid,
+        "Ask": ask,
+        "Last": last,
+    })
+    if not with_truth:
+        return chain
+
+    truth = pd.DataFrame({
+        "StrikePrice": K,
+        "ExpiryDate": expiry.to_numpy(),
+        "T": T,
+        "sigma": sigma,
+        "call": call,
+        "put": put,
+        "rate_shift": shift,
+    })
+    return chain, truth
+
+
+def generate_snapshots(
+        spec: ChainSpec = ChainSpec(),
+        start: datetime | None = None,
+        periods: int = 60,
+        freq: timedelta = timedelta(minutes=1),
+        spot_volatility: float | None = None,
+        seed: int | None = None):
+    """
+    Yield (fetched_at, spot, chain) for `periods` snapshots `freq` apart, with
+    the spot following a geometric random walk at `spot_volatility`
+    (annualized, default the chain's own volatility). Violations are redrawn
+    every snapshot.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime.now() if start is None else start
+    spot_volatility = spec.volatility if spot_volatility is None else spot_volatility
+    step = spot_volatility * np.sqrt(freq.total_seconds() / (365 * 24 * 3600))
+
+    spot = spec.spot
+    for i in range(periods):
+        fetched_at = start + i * freq
+        chain = generate_chain(spec, now=fetched_at, seed=int(rng.integers(2 ** 32)), spot=spot)
+        yield fetched_at, spot, chain
+        spot *= float(np.exp(step * rng.standard_normal() - 0.5 * step ** 2))
@@ -1,19 +1,22 @@
 import refinitiv.data as rd
 import pandas as pd
 
+from deviltongues.providers import get_provider
 
-rd.open_session() # opens your session to refinitiv
-                  # if we figure out how to connect WITHOUT the desktop app,
-                  # then this is where we'll update the code.
+
+provider = get_provider()
+provider.open() # opens (or shares) the process-wide refinitiv session
+                # if we figure out how to connect WITHOUT the desktop app,
+                # then this is where we'll update the code.
 
 # Get underlying spot
 underlying_ric = "TSLA.O"
-spot_df = rd.get_data(underlying_ric, ['TR.PriceClose'])
+spot_df = provider.get_data(underlying_ric, ['TR.PriceClose'])
 spot = spot_df['Price Close'].iloc[0]
 print(f"underlying spot: {spot:.2f}")
 
 # fetches options chain strikes, expiries, and RICs
-strikes_and_expiries=rd.discovery.search(
+strikes_and_expiries=provider.search(
     view = rd.discovery.Views.EQUITY_QUOTES,
     top = 1000, # 'top' controls the max number of rows returned, 1000 is max
     filter = "( SearchAllCategoryv2 eq 'Options' and "
@@ -32,7 +35,7 @@ strikes_and_expiries=rd.discovery.search(
 print(strikes_and_expiries)
 
 # fetches most recent price info for each ric
-price_data = rd.get_data(
+price_data = provider.get_data(
     universe=strikes_and_expiries['RIC'].unique().tolist(),
     fields=[
         'CF_BID', 'CF_ASK', 'CF_LAST'
@@ -49,4 +52,4 @@ options_surface = strikes_and_expiries.merge(
     price_data, on='RIC', how='left'
 )
 
-rd.close_session()
+provider.close()
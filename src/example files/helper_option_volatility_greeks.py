@@ -17,18 +17,27 @@ import \
     IPython  # We use `clear_output` for users who wish to loop graph production on a regular basis. We'll use this to `display` data (e.g.: pandas data-frames).
 from plotly import subplots
 import plotly
-import time  # This is to pause our code when it needs to slow down
 import numpy as np
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed  # IPA batches and RIC probes are sent a few at a time
 import refinitiv.data as rd
+from deviltongues.session import session_manager  # One session per process, shared with the app if both are loaded.
+from deviltongues.providers import RecordedError, get_provider  # search/history go through the provider, so they can be recorded and replayed
+from deviltongues.chain_cache import ExchangeCodeCache  # exchange codes per underlying, kept on disk
+from deviltongues.ratelimit import TokenBucket  # paces IPA batches to the request quota
+from deviltongues.resilience import request_executor  # timeouts, retries and circuit breaking for the calls that do not go through the provider
+from deviltongues.black_scholes import greeks, implied_volatility  # local implied volatility and Greeks, instead of one IPA call per timestamp
 
 try:
-    rd.open_session(
+    session_manager.configure(
         # For more info on the session, use `rd.get_config().as_dict()`
         name="desktop.workspace",
         config_name="C:/Example.DataLibrary.Python-main/Configuration/refinitiv-data.config.json")
+    session_manager.acquire(retries=0)
     print("We're on 'desktop.workspace' Session")
 except:
-    rd.open_session()
+    session_manager.configure()
+    session_manager.acquire()
 
 # # ----------------------------------
 # # I'd like to 1st create a workflow that enables us to output clean errors:
@@ -49,14 +58,21 @@ class MyException(Exception):
         return self.details.data
 
 
+exchange_code_cache = ExchangeCodeCache()  # underlying -> exchange codes, so `discovery.search` is only needed for underlyings never seen before.
+
+
 # # ----------------------------------
 # # Now let's create helper functions in the `get_options_RIC` CLass
 # # ----------------------------------
 
 class get_options_RIC():
 
-    def __init__(self):  # Constroctor
-        return None
+    def __init__(
+            self,
+            exchange_cache=None,  # Defaults to `exchange_code_cache`, shared by every `get_options_RIC()` and kept on disk.
+            max_probes=8):  # Constroctor
+        self.exchange_cache = exchange_code_cache if exchange_cache is None else exchange_cache
+        self.max_probes = max_probes  # How many candidate RICs are probed at once.
 
     def _get_exchange_code(
             self,
@@ -76,7 +92,11 @@ class get_options_RIC():
             - list[str]: The exchange codes associated with the asset.
         """
 
-        response = rd.discovery.search(
+        exchange_codes = self.exchange_cache.get(asset)
+        if exchange_codes is not None:
+            return exchange_codes
+
+        response = get_provider().search(
             query=asset,
             filter="SearchAllCategory eq 'Options' and Periodicity eq 'Monthly' ",
             select='ExchangeCode',
@@ -90,6 +110,7 @@ class get_options_RIC():
         exchange_codes = []
         for exchange in exchanges:
             exchange_codes.append(exchange)
+        self.exchange_cache.put(asset, exchange_codes)
         return exchange_codes
 
     def _get_exp_month(
@@ -137,11 +158,11 @@ class get_options_RIC():
     def _request_prices(self, ric, debug):
         prices = []
         try:
-            prices = rd.get_history(ric,
-                                    fields=['BID', 'ASK', 'TRDPRC_1', 'SETTLE'])
-        except rd.errors.RDError as err:
+            prices = get_provider().get_history(ric,
+                                                fields=['BID', 'ASK', 'TRDPRC_1', 'SETTLE'])
+        except Exception as err:  # Candidates are probed side by side, so one that fails (not found, timed out, circuit open, ...) only means this candidate has no prices.
             if debug:
-                print(f'Constructed ric {ric} -  {err}')
+                print(f'Constructed ric {ric} -  {type(err).__name__}: {err}')
 
             # if self.debug:
             #     print("\n")
@@ -150,7 +171,58 @@ class get_options_RIC():
 
         return prices
 
-    def get_ric_opra(self, asset, maturity, strike, opt_type, debug):
+    def _probe(self, candidates, debug):
+        """
+        Ask for the prices of every candidate RIC at once, `max_probes` at a
+        time, and return `(exchange, ric, prices)` of the first candidate in
+        `candidates` order that has prices, or `None` if none has. As soon as
+        one candidate has prices the probes of the ones after it are
+        cancelled, but the ones before it are still waited for, so the answer
+        is the same as probing them one after another.
+        """
+        if len(candidates) == 0:
+            return None
+        results = [None] * len(candidates)
+        cutoff = [len(candidates)]  # Index of the first candidate found with prices so far.
+
+        def probe(i, ric):
+            if i > cutoff[0]:  # An earlier candidate already has prices.
+                return []
+            return self._request_prices(ric, debug=debug)
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_probes, len(candidates)))
+        try:
+            futures = [pool.submit(probe, i, ric) for i, (exch, ric) in enumerate(candidates)]
+            index = {future: i for i, future in enumerate(futures)}
+            first = 0
+            for future in as_completed(futures):
+                i = index[future]
+                results[i] = [] if future.cancelled() else future.result()
+                if len(results[i]) != 0 and i < cutoff[0]:
+                    cutoff[0] = i
+                    for later in futures[i + 1:]:
+                        later.cancel()
+                while first < len(candidates) and results[first] is not None:
+                    if len(results[first]) != 0:
+                        exch, ric = candidates[first]
+                        return exch, ric, results[first]
+                    if debug:
+                        print(f'Constructed {candidates[first][1]} RIC with specified parameters is not found')
+                    first += 1
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return None
+
+    def _first_valid(self, rics, debug):
+        """`(ric, prices)` of the first of `rics` found to have prices, else the last one with no prices, as the `get_ric_*` functions always returned."""
+        found = self._probe([(None, ric) for ric in rics], debug)
+        if found is None:
+            if debug:
+                print('RIC with specified parameters is not found')
+            return rics[-1], []
+        return found[1], found[2]
+
+    def _opra_rics(self, asset, maturity, strike, opt_type):
 
         maturity = pd.to_datetime(maturity)
 
@@ -195,18 +267,9 @@ class get_options_RIC():
         # build ric
         ric = asset_name + exp_month + str(maturity.day) + str(maturity.year)[
             -2:] + strike_ric + '.U'
-        ric = self._check_expiry(ric, maturity, ident)
-
-        prices = self._request_prices(ric, debug=debug)
-
-        # return valid ric(s)
-        if len(prices) == 0:
-            if debug:
-                print('RIC with specified parameters is not found')
-
-        return ric, prices
+        return [self._check_expiry(ric, maturity, ident)]
 
-    def get_ric_hk(self, asset, maturity, strike, opt_type, debug):
+    def _hk_rics(self, asset, maturity, strike, opt_type):
         maturity = pd.to_datetime(maturity)
 
         # get asset name and strike price for the asset
@@ -220,34 +283,21 @@ class get_options_RIC():
         # get expiration month codes
         ident, exp_month = self._get_exp_month(maturity, opt_type)
 
-        # get rics for options on indexes. Return if valid add to the possible_rics list if no price is found
+        # rics for options on indexes
         if asset[0] == '.':
             ric = asset_name + strike_ric + exp_month + str(maturity.year)[
                 -1:] + '.HF'
-            ric = self._check_expiry(ric, maturity, ident)
-            prices = self._request_prices(ric, debug=debug)
-            if len(prices) == 0:
-                if debug:
-                    print('RIC with specified parameters is not found')
-            else:
-                return ric, prices
-        else:
-            # get rics for options on equities. Return if valid add to the possible_rics list if no price is found
-            # there could be several generations of options depending on the number of price adjustments due to a corporate event
-            # here we use 4 adjustment opportunities.
-            for i in range(4):
-                ric = asset_name + strike_ric + str(i) + exp_month + str(
-                    maturity.year)[-1:] + '.HK'
-                ric = self._check_expiry(ric, maturity, ident)
-                prices = self._request_prices(ric, debug=debug)
-                if len(prices) == 0:
-                    if debug:
-                        print('RIC with specified parameters is not found')
-                else:
-                    return ric, prices
-        return ric, prices
-
-    def get_ric_ose(self, asset, maturity, strike, opt_type, debug):
+            return [self._check_expiry(ric, maturity, ident)]
+        # rics for options on equities:
+        # there could be several generations of options depending on the number of price adjustments due to a corporate event
+        # here we use 4 adjustment opportunities.
+        return [
+            self._check_expiry(
+                asset_name + strike_ric + str(i) + exp_month + str(maturity.year)[-1:] + '.HK',
+                maturity, ident)
+            for i in range(4)]
+
+    def _ose_rics(self, asset, maturity, strike, opt_type):
 
         maturity = pd.to_datetime(maturity)
         strike_ric = str(strike)[:3]
@@ -262,33 +312,20 @@ class get_options_RIC():
             asset_name = index_dict[asset.split('.')[1]]
 
             # we consider also J-NET (Off-Auction(with "L")) and High  frequency (with 'R') option structures
-            for jnet in j_nets:
-                ric = asset_name + jnet + strike_ric + exp_month + str(
-                    maturity.year)[-1:] + '.OS'
-                ric = self._check_expiry(ric, maturity, ident)
-                prices = self._request_prices(ric, debug=debug)
-                if len(prices) == 0:
-                    if debug:
-                        print('RIC with specified parameters is not found')
-                else:
-                    return ric, prices
-        else:
-            asset_name = asset.split('.')[0]
-            # these are generation codes similar to one from HK
-            for jnet in j_nets:
-                for gen in generations:
-                    ric = asset_name + jnet + gen + strike_ric + exp_month + str(
-                        maturity.year)[-1:] + '.OS'
-                    ric = self._check_expiry(ric, maturity, ident)
-                    prices = self._request_prices(ric, debug=debug)
-                    if len(prices) == 0:
-                        if debug:
-                            print('RIC with specified parameters is not found')
-                    else:
-                        return ric, prices
-        return ric, prices
-
-    def get_ric_eurex(self, asset, maturity, strike, opt_type, debug):
+            return [
+                self._check_expiry(
+                    asset_name + jnet + strike_ric + exp_month + str(maturity.year)[-1:] + '.OS',
+                    maturity, ident)
+                for jnet in j_nets]
+        asset_name = asset.split('.')[0]
+        # these are generation codes similar to one from HK
+        return [
+            self._check_expiry(
+                asset_name + jnet + gen + strike_ric + exp_month + str(maturity.year)[-1:] + '.OS',
+                maturity, ident)
+            for jnet in j_nets for gen in generations]
+
+    def _eurex_rics(self, asset, maturity, strike, opt_type):
         maturity = pd.to_datetime(maturity)
 
         if asset[0] == '.':
@@ -316,19 +353,13 @@ class get_options_RIC():
             strike_ric = str(int_part) + dec_part
 
         generations = ['', 'a', 'b', 'c', 'd']
-        for gen in generations:
-            ric = asset_name + strike_ric + gen + exp_month + str(
-                maturity.year)[-1:] + '.EX'
-            ric = self._check_expiry(ric, maturity, ident)
-            prices = self._request_prices(ric, debug=debug)
-            if len(prices) == 0:
-                if debug:
-                    print('RIC with specified parameters is not found')
-            else:
-                return ric, prices
-        return ric, prices
+        return [
+            self._check_expiry(
+                asset_name + strike_ric + gen + exp_month + str(maturity.year)[-1:] + '.EX',
+                maturity, ident)
+            for gen in generations]
 
-    def get_ric_ieu(self, asset, maturity, strike, opt_type, debug):
+    def _ieu_rics(self, asset, maturity, strike, opt_type):
         maturity = pd.to_datetime(maturity)
 
         if asset[0] == '.':
@@ -350,47 +381,59 @@ class get_options_RIC():
             strike_ric = '0' + str(int_part) + dec_part
 
         generations = ['', 'a', 'b', 'c', 'd']
-        for gen in generations:
-            ric = asset_name + strike_ric + gen + exp_month + str(
-                maturity.year)[-1:] + '.L'
-            ric = self._check_expiry(ric, maturity, ident)
-            prices = self._request_prices(ric, debug=debug)
-            if len(prices) == 0:
-                if debug:
-                    print(
-                        f'Constructed {ric} RIC with specified parameters is not found')
-            else:
-                return ric, prices
-        return ric, prices
+        return [
+            self._check_expiry(
+                asset_name + strike_ric + gen + exp_month + str(maturity.year)[-1:] + '.L',
+                maturity, ident)
+            for gen in generations]
+
+    def get_ric_opra(self, asset, maturity, strike, opt_type, debug):
+        return self._first_valid(self._opra_rics(asset, maturity, strike, opt_type), debug)
+
+    def get_ric_hk(self, asset, maturity, strike, opt_type, debug):
+        return self._first_valid(self._hk_rics(asset, maturity, strike, opt_type), debug)
+
+    def get_ric_ose(self, asset, maturity, strike, opt_type, debug):
+        return self._first_valid(self._ose_rics(asset, maturity, strike, opt_type), debug)
+
+    def get_ric_eurex(self, asset, maturity, strike, opt_type, debug):
+        return self._first_valid(self._eurex_rics(asset, maturity, strike, opt_type), debug)
+
+    def get_ric_ieu(self, asset, maturity, strike, opt_type, debug):
+        return self._first_valid(self._ieu_rics(asset, maturity, strike, opt_type), debug)
 
     def get_option_ric(self, asset, maturity, strike, opt_type, debug,
                        exchange_not_supported_message_count=0):
 
-        # define covered exchanges along with functions to get RICs from
+        # define covered exchanges along with functions to get candidate RICs from
         exchanges = {
-            'OPQ': self.get_ric_opra,
-            'IEU': self.get_ric_ieu,
-            'EUX': self.get_ric_eurex,
-            'HKG': self.get_ric_hk,
-            'HFE': self.get_ric_hk,
-            'OSA': self.get_ric_ose}
-
-        # get exchanges codes where the option on the given asset is traded
+            'OPQ': self._opra_rics,
+            'IEU': self._ieu_rics,
+            'EUX': self._eurex_rics,
+            'HKG': self._hk_rics,
+            'HFE': self._hk_rics,
+            'OSA': self._ose_rics}
+
+        # get exchanges codes where the option on the given asset is traded (from `exchange_code_cache` if we have seen `asset` before)
         exchnage_codes = self._get_exchange_code(asset)
-        # get the list of (from all available and covered exchanges) valid rics and their prices
-        options_data = {}
+        # candidate rics on all available and covered exchanges; they are all probed at once and the first valid one is returned
+        candidates = {}
         for exch in exchnage_codes:
             if exch in exchanges.keys():
-                ric, prices = exchanges[exch](asset, maturity, strike, opt_type,
-                                              debug)
-                if len(prices) != 0:
-                    options_data[ric] = prices
-                    if debug:
-                        print(
-                            f'Option RIC for {exch} exchange is successfully constructed')
+                for ric in exchanges[exch](asset, maturity, strike, opt_type):
+                    candidates.setdefault(ric, exch)  # HKG and HFE build the same rics
             else:
                 if exchange_not_supported_message_count < 1:
                     print(f'The {exch} exchange is not supported yet')
+
+        options_data = {}
+        found = self._probe([(exch, ric) for ric, exch in candidates.items()], debug)
+        if found is not None:
+            exch, ric, prices = found
+            options_data[ric] = prices
+            if debug:
+                print(
+                    f'Option RIC for {exch} exchange is successfully constructed')
         return options_data
 
     def get_option_ric_through_strike_range(
@@ -569,9 +612,13 @@ class IPA_Equity_Vola_n_Greeeks():
                             'VolgaAmountInReportCcy', 'YearsToExpiry',
                             'ZommaAmountInDealCcy', 'ZommaAmountInReportCcy'],
             search_batch_max=90,
-            slep=0.6,
             corr=True,
-            hist_vol=True):  # Constroctor
+            hist_vol=True,
+            engine='local',  # 'local' computes implied volatilities and Greeks here; 'IPA' asks IPA for them.
+            ipa_cross_check=False,  # With `engine='local'`, also ask IPA and keep both volatilities in `self.ipa_check`.
+            dividend_yield_prct=0.0,
+            ipa_requests_per_second=4,  # IPA batches are paced to this many calls a second, under the IPA request quota.
+            ipa_workers=4):  # Constroctor
         '''
         IPA_Equity_Vola_n_Greeeks() Python Class Version 1.0:
             This Class was built and tested in Python 3.11.3.
@@ -585,7 +632,6 @@ class IPA_Equity_Vola_n_Greeeks():
         matplotlib version 3.8.2
         IPython version 8.17.2
         datetime (native to Python)
-        time (native to Python)
         get_options_RIC() Python Class
         '''
 
@@ -616,9 +662,14 @@ class IPA_Equity_Vola_n_Greeeks():
         self.rsk_free_rate_prct_field = rsk_free_rate_prct_field
         self.request_fields = request_fields
         self.search_batch_max = search_batch_max
-        self.slep = slep
         self.corr = corr
         self.hist_vol = hist_vol
+        self.engine = engine
+        self.ipa_cross_check = ipa_cross_check
+        self.dividend_yield_prct = dividend_yield_prct
+        self.ipa_check = None
+        self.ipa_workers = ipa_workers
+        self._ipa_bucket = TokenBucket(ipa_requests_per_second)  # Shared by every IPA call of this instance, including `_ipa_cross_check`.
 
     def initiate(
             self,
@@ -639,8 +690,8 @@ class IPA_Equity_Vola_n_Greeeks():
                         strike_maturity_pr_call = self.maturity
 
                     self.strike = \
-                    rd.get_history(self.underlying, "TR.ClosePrice",
-                                   start=strike_maturity_pr_call).values[0][0]
+                    get_provider().get_history(self.underlying, "TR.ClosePrice",
+                                               start=strike_maturity_pr_call).values[0][0]
                     self.strike = round(self.strike, -1)
                     try_no += 1
                 except:
@@ -714,13 +765,15 @@ class IPA_Equity_Vola_n_Greeeks():
         if self.debug:
             print(
                 f"optn_mrkt_pr_gmt = rd.content.historical_pricing.summaries.Definition(universe='{undrlying_optn_ric}',start='{sdate}',end='{edate}',interval='{self.data_retrieval_interval}',fields={fields_lst}).get_data().data.df")
-        optn_mrkt_pr_gmt = rd.content.historical_pricing.summaries.Definition(
-            universe=undrlying_optn_ric,
-            start=sdate,
-            end=edate,
-            interval=self.data_retrieval_interval,
-            fields=fields_lst
-        ).get_data().data.df
+        optn_mrkt_pr_gmt = request_executor.call(
+            "get_history", session_manager.call,
+            rd.content.historical_pricing.summaries.Definition(
+                universe=undrlying_optn_ric,
+                start=sdate,
+                end=edate,
+                interval=self.data_retrieval_interval,
+                fields=fields_lst
+            ).get_data).data.df
         if 'TRDPRC_1' in optn_mrkt_pr_gmt.columns:
             if len(optn_mrkt_pr_gmt.TRDPRC_1.dropna()) > 0:
                 optn_mrkt_pr_gmt = pd.DataFrame(
@@ -758,13 +811,15 @@ class IPA_Equity_Vola_n_Greeeks():
             print("optn_mrkt_pr_gmt 1st")
             display(optn_mrkt_pr_gmt)
 
-        undrlying_mrkt_pr_gmt = rd.content.historical_pricing.summaries.Definition(
-            universe=self.underlying,
-            start=df_strt_dt_str,
-            end=df_end_dt_str,
-            interval=self.data_retrieval_interval,
-            fields=optn_mrkt_pr_gmt.columns.array[0]
-        ).get_data().data.df
+        undrlying_mrkt_pr_gmt = request_executor.call(
+            "get_history", session_manager.call,
+            rd.content.historical_pricing.summaries.Definition(
+                universe=self.underlying,
+                start=df_strt_dt_str,
+                end=df_end_dt_str,
+                interval=self.data_retrieval_interval,
+                fields=optn_mrkt_pr_gmt.columns.array[0]
+            ).get_data).data.df
         undrlying_mrkt_pr_gmt_cnt = undrlying_mrkt_pr_gmt.count()
         if self.debug:
             print("undrlying_mrkt_pr_gmt 1st")
@@ -822,40 +877,31 @@ class IPA_Equity_Vola_n_Greeeks():
             univ,
             flds,
             strt,
-            nd,
-            trs=6):
+            nd):
+        # Timeouts, retries with backoff and the circuit breaker are in `request_executor`, which every provider call goes through.
 
         if self.debug:
             print(
                 f"rd.get_history(universe={univ}, fields={flds},start='{strt}', end='{nd}')")
 
-        while trs:
-            try:
-                trs -= 1
-                _df = rd.get_history(
-                    universe=univ,
-                    fields=flds,
-                    start=strt, end=nd)
-                trs = 0  # break, because no error
-            except Exception:  # catch all exceptions
-                time.sleep(self.slep)
-                _df = None
-
-        if self.debug:
-            print(f"_df")
-            display(_df)
-
-        if _df is None:  # If `_df` doesn't exist
+        try:
+            _df = get_provider().get_history(
+                universe=univ,
+                fields=flds,
+                start=strt, end=nd)
+        except Exception as e:
             print("\n")
             print("Please note that the following failed:")
-            print(_df)
             print(
                 f"rd.get_history(universe={univ}, fields={flds},start='{strt}', end='{nd}')")
-            display(
-                rd.get_history(universe=univ, fields=flds, start=strt, end=nd))
+            print(f"{type(e).__name__}: {e}")
             print(f"Please consider another instrument other than {univ}")
             raise ValueError(
-                f"Issue with `_df`, itself taken from `rd.get_history(universe={univ}, fields={flds},start='{strt}', end='{nd}')`")
+                f"Issue with `_df`, itself taken from `rd.get_history(universe={univ}, fields={flds},start='{strt}', end='{nd}')`") from e
+
+        if self.debug:
+            print(f"_df")
+            display(_df)
 
         return _df
 
@@ -944,6 +990,58 @@ class IPA_Equity_Vola_n_Greeeks():
             print("self.df_gmt_no_na")
             display(self.df_gmt_no_na)
 
+        if self.engine == 'IPA':
+            ipa_df_gmt_no_na, ipa_univ_requ, _request_fields = self._get_ipa_data()
+        else:
+            # Implied volatility and Greeks for every timestamp at once, computed locally, so there are no IPA round trips.
+            ipa_df_gmt_no_na, ipa_univ_requ, _request_fields = self._get_local_data(), [], []
+            if self.ipa_cross_check:
+                self.ipa_check = self._ipa_cross_check(ipa_df_gmt_no_na)
+
+        if self.debug and len(ipa_df_gmt_no_na) > 0:
+            print("ipa_df_gmt_no_na 1st:")
+            display(ipa_df_gmt_no_na)
+
+        ipa_df_gmt_no_na.index = self.df_gmt_no_na.index
+        ipa_df_gmt_no_na.columns.name = self.df_gmt_no_na.columns.name
+
+        self.df = ipa_df_gmt_no_na.copy()
+        if self.corr:
+            # silense a PerformanceWarinng
+            import warnings
+            warnings.simplefilter(action='ignore',
+                                  category=pd.errors.PerformanceWarning)
+            # Now add the new column for correnation
+            corr_df = self.df['OptionPrice'].ffill().rolling(window=63).corr(
+                self.df['Volatility'].ffill())
+            # corr_df = pd.to_numeric(self.df['OptionPrice'].ffill().rolling(window=63).corr(self.df['Volatility'].ffill()))
+            self.df['3M(63WorkDay)MovCorr(StkprImpvola)'] = corr_df
+        if self.hist_vol:
+            # Resample data to daily frequency by taking the mean of intraday data
+            self.df_daily = self.df.select_dtypes(
+                include=[np.number]).resample(rule='B').mean()
+            for i in ["OptionPrice", "UnderlyingPrice"]:
+                # Forward fill it to get rid on NAs that represent a lack of movement in price
+                self.df_daily[i] = self.df_daily[i].ffill()
+                # Calculate the Historical Volatility on a 30 day moving window and implement it in main dataframe
+                self.df_daily[f'30DHist{i}DailyVolatility'] = self.df_daily[
+                    i].rolling(window=30).std()
+                self.df_daily[f'30DHist{i}DailyVolatilityAnnualized'] = \
+                self.df_daily[f'30DHist{i}DailyVolatility'] * np.sqrt(252)
+                self.df = pd.merge_asof(
+                    self.df,
+                    self.df_daily[[f'30DHist{i}DailyVolatility',
+                                   f'30DHist{i}DailyVolatilityAnnualized']],
+                    left_index=True, right_index=True, direction='backward')
+
+        self._request_fields = _request_fields
+        self.rf_rate_prct = rf_rate_prct
+        self.ipa_univ_requ = ipa_univ_requ
+        self.ipa_df_gmt_no_na = ipa_df_gmt_no_na
+        return self
+
+    def _get_ipa_data(self):
+        """One IPA option Definition per row of `self.df_gmt_no_na`, priced in batches of `search_batch_max`."""
         ipa_univ_requ = [
             rd.content.ipa.financial_contracts.option.Definition(
                 strike=float(self.strike),
@@ -1016,7 +1114,6 @@ class IPA_Equity_Vola_n_Greeeks():
                       "RiskFreeRatePercent", "UnderlyingPrice", "Volatility"][
             ::-1]:  # We would like to keep a minimum of these fields in the Search Responce in order to construct following graphs.
             request_fields = [i_str] + self.request_fields
-        i_int = 0
         _request_fields = request_fields.copy()
 
         # if self.debug:
@@ -1026,94 +1123,139 @@ class IPA_Equity_Vola_n_Greeeks():
         #     print(ipa_univ_requ)
         #     print("\n")
 
-        no_of_ipa_calls = len(
-            [ipa_univ_requ[j_int:j_int + self.search_batch_max] for j_int in
-             range(0, len(ipa_univ_requ), self.search_batch_max)])
+        ipa_batches = [ipa_univ_requ[j_int:j_int + self.search_batch_max] for j_int in
+                       range(0, len(ipa_univ_requ), self.search_batch_max)]  # This list chunks our `ipa_univ_requ` in batches of `search_batch_max`
+        no_of_ipa_calls = len(ipa_batches)
         if no_of_ipa_calls > 100 or self.debug:
             print(
                 f"There are {no_of_ipa_calls} to make. This may take a long while. If this is too long, please consider changing the `IPA_Equity_Vola_n_Greeeks` argument from {self.data_retrieval_interval} to a longer interval")
 
-        for enum, i_rdf_bd in enumerate(
-                [ipa_univ_requ[j_int:j_int + self.search_batch_max] for j_int in
-                 range(0, len(ipa_univ_requ),
-                       self.search_batch_max)]):  # This list chunks our `ipa_univ_requ` in batches of `search_batch_max`
-
-            # IPA may sometimes come back to us saying that Implied VOlatilities cannot be computed. This can happen sometimes due to extreme Moneyness and closeness to expiration. To investigate these issues, we create this 1st try loop:
-            try:
-                try:  # One issue we may encounter here is that the field 'ErrorMessage' in `request_fields` may break the `get_data()` call and therefore the for loop. we may therefore have to remove 'ErrorMessage' in the call; ironically when it is most useful.
-                    ipa_df_get_data_return = rd.content.ipa.financial_contracts.Definitions(
-                        universe=i_rdf_bd, fields=request_fields).get_data()
-                except:  # https://stackoverflow.com/questions/11520492/difference-between-del-remove-and-pop-on-lists
-                    _request_fields.remove('ErrorMessage')
-                    ipa_df_get_data_return = rd.content.ipa.financial_contracts.Definitions(
-                        universe=i_rdf_bd, fields=request_fields).get_data()
-            except:
-                if self.debug:
-                    print("request_fields")
-                    print(request_fields)
-                    print(f"ipa_univ_requ_debug_buckets[{enum}]")
-                    display(ipa_univ_requ_debug_buckets[enum])
-                _request_fields.remove('ErrorMessage')
-                ipa_df_get_data_return = rd.content.ipa.financial_contracts.Definitions(
-                    universe=i_rdf_bd, fields=request_fields).get_data()
-
-            _ipa_df_gmt_no_na = ipa_df_get_data_return.data.df
-            if i_int == 0:
-                ipa_df_gmt_no_na = _ipa_df_gmt_no_na.drop("ErrorMessage",
-                                                          axis=1)  # We only keep "ErrorMessage" for debugging in self._IPA_df.
+        # Batches go out `ipa_workers` at a time, each first taking a token from `self._ipa_bucket`, so the pace is set by the IPA quota rather than by a fixed pause after every batch.
+        fell_back = []
+        fetch = self._ipa_bucket.limit(self._ipa_batch)
+        ipa_frames = [None] * no_of_ipa_calls
+        failed = []
+        if ipa_batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.ipa_workers, no_of_ipa_calls))) as pool:
+                futures = [pool.submit(fetch, i_rdf_bd, request_fields, fell_back) for i_rdf_bd in ipa_batches]
+                for enum, future in enumerate(futures):
+                    try:
+                        ipa_frames[enum] = future.result()
+                    except Exception as e:
+                        failed.append(enum)
+                        if self.debug:
+                            print(f"IPA batch {enum} failed ({e}); its contracts will be retried one at a time.")
+                            print("request_fields")
+                            print(request_fields)
+                            print(f"ipa_univ_requ_debug_buckets[{enum}]")
+                            display(ipa_univ_requ_debug_buckets[enum])
+                    if self.debug or no_of_ipa_calls > 100:
+                        print(enum + 1)
+
+        # IPA may sometimes come back to us saying that Implied VOlatilities cannot be computed. This can happen sometimes due to extreme Moneyness and closeness to expiration, and one such contract can sink its whole batch. We therefore retry the contracts of a failed batch individually; one that still fails is left as a row of NaNs so rows keep lining up with `self.df_gmt_no_na`.
+        for enum in failed:
+            rows = {}
+            for j_int, i_rdf in enumerate(ipa_batches[enum]):
+                try:
+                    rows[j_int] = fetch([i_rdf], request_fields, fell_back)
+                except Exception as e:
+                    print(f"IPA could not price contract {j_int} of batch {enum}: {e}")
+            positions = range(len(ipa_batches[enum]))
+            if rows:
+                ipa_frames[enum] = pd.concat(list(rows.values()), keys=list(rows)).droplevel(1).reindex(positions)
             else:
-                ipa_df_gmt_no_na = pd.concat(
-                    [ipa_df_gmt_no_na,
-                     _ipa_df_gmt_no_na.drop(labels=["ErrorMessage"], axis=1)],
-                    ignore_index=True)
-            i_int += 1
-            time.sleep(1)
-            if self.debug:
-                print(i_int)
-            if not self.debug and no_of_ipa_calls > 100:
-                print(i_int)
-
-        if self.debug and len(ipa_df_gmt_no_na) > 0:
-            print("ipa_df_gmt_no_na 1st:")
-            display(ipa_df_gmt_no_na)
+                ipa_frames[enum] = pd.DataFrame(index=positions)
 
-        ipa_df_gmt_no_na.index = self.df_gmt_no_na.index
-        ipa_df_gmt_no_na.columns.name = self.df_gmt_no_na.columns.name
+        if fell_back:
+            _request_fields.remove('ErrorMessage')
+        ipa_df_gmt_no_na = pd.concat(ipa_frames, ignore_index=True).drop(
+            columns="ErrorMessage", errors="ignore")  # We only keep "ErrorMessage" for debugging in self._IPA_df.
+        if len(ipa_df_gmt_no_na.columns) == 0:
+            raise ValueError(
+                f"IPA returned no data for any of the {len(ipa_univ_requ)} contracts: every batch and every single-contract retry failed. Run with `debug=True` to see the errors.")
 
-        self.df = ipa_df_gmt_no_na.copy()
-        if self.corr:
-            # silense a PerformanceWarinng
-            import warnings
-            warnings.simplefilter(action='ignore',
-                                  category=pd.errors.PerformanceWarning)
-            # Now add the new column for correnation
-            corr_df = self.df['OptionPrice'].ffill().rolling(window=63).corr(
-                self.df['Volatility'].ffill())
-            # corr_df = pd.to_numeric(self.df['OptionPrice'].ffill().rolling(window=63).corr(self.df['Volatility'].ffill()))
-            self.df['3M(63WorkDay)MovCorr(StkprImpvola)'] = corr_df
-        if self.hist_vol:
-            # Resample data to daily frequency by taking the mean of intraday data
-            self.df_daily = self.df.select_dtypes(
-                include=[np.number]).resample(rule='B').mean()
-            for i in ["OptionPrice", "UnderlyingPrice"]:
-                # Forward fill it to get rid on NAs that represent a lack of movement in price
-                self.df_daily[i] = self.df_daily[i].ffill()
-                # Calculate the Historical Volatility on a 30 day moving window and implement it in main dataframe
-                self.df_daily[f'30DHist{i}DailyVolatility'] = self.df_daily[
-                    i].rolling(window=30).std()
-                self.df_daily[f'30DHist{i}DailyVolatilityAnnualized'] = \
-                self.df_daily[f'30DHist{i}DailyVolatility'] * np.sqrt(252)
-                self.df = pd.merge_asof(
-                    self.df,
-                    self.df_daily[[f'30DHist{i}DailyVolatility',
-                                   f'30DHist{i}DailyVolatilityAnnualized']],
-                    left_index=True, right_index=True, direction='backward')
+        return ipa_df_gmt_no_na, ipa_univ_requ, _request_fields
 
-        self._request_fields = _request_fields
-        self.rf_rate_prct = rf_rate_prct
-        self.ipa_univ_requ = ipa_univ_requ
-        self.ipa_df_gmt_no_na = ipa_df_gmt_no_na
-        return self
+    def _ipa_batch(self, batch, request_fields, fell_back):
+        """One IPA `get_data` call for a batch of option Definitions, as a DataFrame."""
+        try:
+            return request_executor.call(
+                "ipa", session_manager.call,
+                rd.content.ipa.financial_contracts.Definitions(
+                    universe=batch, fields=request_fields).get_data).data.df
+        except (TimeoutError, ConnectionError):  # Timeouts, an open circuit breaker and dropped connections were already retried by `request_executor`; asking for fewer fields would only repeat that.
+            raise
+        except Exception:  # The field 'ErrorMessage' in `request_fields` may break the `get_data()` call. We therefore have to remove it from the call; ironically when it is most useful.
+            if 'ErrorMessage' not in request_fields:
+                raise
+            fell_back.append(True)
+            return request_executor.call(
+                "ipa", session_manager.call,
+                rd.content.ipa.financial_contracts.Definitions(
+                    universe=batch,
+                    fields=[i for i in request_fields if i != 'ErrorMessage']).get_data).data.df
+
+    def _get_local_data(self):
+        """
+        The IPA columns this Class uses, from a local Black-Scholes model: the implied
+        volatility of every option price in `self.df_gmt_no_na` is solved in one
+        vectorised pass (see `deviltongues.black_scholes`), then its Greeks.
+        Rates are continuously compounded; dividends are the flat `dividend_yield_prct`.
+        """
+        df = self.df_gmt_no_na
+        expiry = pd.Timestamp(datetime.strptime(self.maturity, self.maturity_format))
+        years = ((expiry - pd.DatetimeIndex(df.index)) / pd.Timedelta(days=365)).to_numpy(dtype=float)
+        market = df[self.optn_mrkt_pr_field].to_numpy(dtype=float)
+        spot = df[self.underlying_pr_field].to_numpy(dtype=float)
+        rate_prct = df['RfRatePrct'].to_numpy(dtype=float)
+        rate, dividend = rate_prct / 100, self.dividend_yield_prct / 100
+
+        vol = implied_volatility(market, spot, float(self.strike), years, rate, dividend, call=self.option_type)
+        g = greeks(spot, float(self.strike), years, rate, vol, dividend, call=self.option_type)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            local_df = pd.DataFrame({
+                'CallPut': self.option_type.upper(),
+                'ExerciseStyle': self.exercise_style,
+                'Strike': float(self.strike),
+                'UnderlyingRIC': self.underlying,
+                'UnderlyingPrice': spot,
+                'OptionPrice': g.price,
+                'MarketValueInDealCcy': market,
+                'RiskFreeRatePercent': rate_prct,
+                'DividendYieldPercent': self.dividend_yield_prct,
+                'YearsToExpiry': years,
+                'DaysToExpiry': years * 365,
+                # Volatilities in percent, as IPA returns them.
+                'Volatility': vol * 100,
+                'VolatilityPercent': vol * 100,
+                'DailyVolatility': vol * 100 / np.sqrt(252),
+                'DailyVolatilityPercent': vol * 100 / np.sqrt(252),
+                # Percent Greeks: delta in %, gamma as the change in delta (in %) for a 1% move of the underlying,
+                # vega per volatility point, theta per calendar day and rho per rate point.
+                'DeltaPercent': g.delta * 100,
+                'GammaPercent': g.gamma * spot,
+                'VegaPercent': g.vega / 100,
+                'ThetaPercent': g.theta / 365,
+                'RhoPercent': g.rho / 100,
+                'HedgeRatio': g.delta,
+                'Gearing': spot / g.price,
+                'Leverage': g.delta * spot / g.price,
+            })
+        return local_df.reset_index(drop=True)
+
+    def _ipa_cross_check(self, local_df):
+        """IPA's implied volatilities next to the local ones, to check the local engine against."""
+        ipa_df, _, _ = self._get_ipa_data()
+        check = pd.DataFrame({
+            'LocalVolatility': local_df['Volatility'].to_numpy(dtype=float),
+            'IPAVolatility': pd.to_numeric(ipa_df['Volatility'], errors='coerce').to_numpy(dtype=float),
+        }, index=self.df_gmt_no_na.index)
+        check['Difference'] = check['LocalVolatility'] - check['IPAVolatility']
+        if self.debug:
+            print("Local vs IPA implied volatility:")
+            display(check['Difference'].describe())
+        return check
 
     def graph(
             self,